@@ -0,0 +1,239 @@
+"""
+This module provides access to the CampaignStore class to record and query campaign history \
+in an embedded SQLite database.
+"""
+
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+type _PathLikeType = str | bytes | os.PathLike
+
+campaignFile = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "savedData", "campaign.db"
+)
+_weatherColumns = (
+    "altitude",
+    "climate",
+    "season",
+    "wind",
+    "temperature",
+    "precipitation",
+    "fog",
+    "cloudCover",
+)
+_schema = f"""
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    party TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    PRIMARY KEY (name, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS playersByParty ON players (party, day);
+CREATE TABLE IF NOT EXISTS parties (
+    party TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    playerCount INTEGER NOT NULL,
+    averageLevel REAL NOT NULL,
+    PRIMARY KEY (party, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS weather (
+    region TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    {", ".join(f"{column} INTEGER NOT NULL" for column in _weatherColumns)},
+    PRIMARY KEY (region, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS weatherByPrecipitation ON weather (region, precipitation, day);
+CREATE TABLE IF NOT EXISTS hoards (
+    id INTEGER PRIMARY KEY,
+    day INTEGER NOT NULL,
+    party TEXT,
+    dungeon INTEGER NOT NULL,
+    treasure INTEGER NOT NULL,
+    value REAL NOT NULL,
+    denomination TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hoardsByParty ON hoards (party, day);
+"""
+
+
+class CampaignStore:
+    """
+    Provides methods for recording players, daily weather, and generated hoards by campaign day, \
+    and for querying them together.
+        The database is opened in WAL mode so tools can read while another tool writes. \
+        Every record method inserts all of its rows with one prepared statement in one transaction.
+    """
+
+    def __init__(self, file: _PathLikeType = campaignFile):
+        self.file = file
+        self.connection = sqlite3.connect(file)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Closes the connection to the database.
+
+        Returns
+        -------
+        None if the database was successfully closed.
+        """
+        self.connection.close()
+
+    def recordPlayers(self, day: int, players: Iterable[Tuple[str, str, int]]):
+        """
+        Records the roster on a campaign day, along with each party's size and average level.
+            Party sizes and average levels are calculated from the given players only, \
+            so every player of each party in players must be given, such as PlayerManager's whole roster. \
+            Parties with no players given keep their earlier snapshots.
+
+        Parameters
+        ----------
+        day : int
+            The campaign day of the records.
+        players : Iterable[Tuple[str, str, int]]
+            The (name, party, level) of every player in the roster on that day. \
+            Recording only some of a party's players replaces its snapshot with their size and average level.
+
+        Returns
+        -------
+        None if the players were successfully recorded.
+        """
+        rows = [(name, day, party, int(level)) for name, party, level in players]
+        partyTotals: Dict[str, List[int]] = {}
+        for _, _, party, level in rows:
+            totals = partyTotals.setdefault(party, [0, 0])
+            totals[0] += 1
+            totals[1] += level
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?)", rows
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO parties VALUES (?, ?, ?, ?)",
+                (
+                    (party, day, count, total / count)
+                    for party, (count, total) in partyTotals.items()
+                ),
+            )
+
+    def recordWeather(self, region: str, days: ArrayLike, arrWeather: ArrayLike):
+        """
+        Records the weather of a region on one or many campaign days.
+
+        Parameters
+        ----------
+        region : str
+            The name of the region, such as the weather file name without its extension.
+        days : ArrayLike
+            The campaign day of each weather array.
+        arrWeather : ArrayLike
+            A weather array such as WeatherData.arrWeather, or a (days, 8) array of weather arrays.
+
+        Returns
+        -------
+        None if the weather was successfully recorded.
+        """
+        # Resolved conditions stored after the weather values are not recorded
+        arrWeather = np.atleast_2d(np.asarray(arrWeather, dtype=np.int64))[:, : len(_weatherColumns)]
+        days = np.broadcast_to(np.asarray(days, dtype=np.int64), len(arrWeather))
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO weather VALUES (?, ?, {', '.join('?' * len(_weatherColumns))})",
+                ((region, day, *values) for day, *values in np.column_stack([days, arrWeather]).tolist()),
+            )
+
+    def recordHoards(self, day: int, treasure: np.ndarray, party: str | None = None):
+        """
+        Records hoards produced by generateTreasureBatch.
+
+        Parameters
+        ----------
+        day : int
+            The campaign day the hoards were generated for.
+        treasure : NDArray[treasureDtype]
+            The structured array of treasure to record.
+        party : str | None
+            If present, the party the hoards were generated for.
+
+        Returns
+        -------
+        None if the hoards were successfully recorded.
+        """
+        columns = [treasure[name].tolist() for name in ("dungeon", "treasure", "value", "denomination")]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO hoards (day, party, dungeon, treasure, value, denomination) VALUES (?, ?, ?, ?, ?, ?)",
+                ((day, party, *row) for row in zip(*columns)),
+            )
+
+    def weatherDays(
+        self,
+        region: str,
+        minPrecipitation: int = 0,
+        party: str | None = None,
+        level: int | None = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Finds the days a region had at least the given precipitation, \
+        optionally only while a party was at a given average level.
+
+        Parameters
+        ----------
+        region : str
+            The name of the region.
+        minPrecipitation : int
+            The lowest precipitation value to include. Possible values: 0: None, 1: Low, 2: Moderate, 3: Heavy
+            Defaults to 0
+        party : str | None
+            If present, the party whose level is checked. Requires level.
+        level : int | None
+            If present, the average party level, rounded to the nearest level, to match. Requires party.
+
+        Returns
+        -------
+        List[Tuple[Any, ...]]
+            The (day, *weather values) rows ordered by day.
+        """
+        if (party is None) != (level is None):
+            raise ValueError("Party and level must be given together to filter weather days by party level.")
+        query = f"SELECT day, {', '.join(_weatherColumns)} FROM weather AS w WHERE region = ? AND precipitation >= ?"
+        parameters: List[Any] = [region, minPrecipitation]
+        if party is not None:
+            # Use the party's latest snapshot on or before each weather day
+            query += """
+                AND (SELECT CAST(averageLevel + 0.5 AS INTEGER) FROM parties
+                     WHERE party = ? AND day <= w.day ORDER BY day DESC LIMIT 1) = ?
+            """
+            parameters += [party, level]
+        return self.connection.execute(query + " ORDER BY day", parameters).fetchall()
+
+    def query(self, sql: str, parameters: Iterable[Any] = ()) -> List[Tuple[Any, ...]]:
+        """
+        Runs any read query against the database.
+
+        Parameters
+        ----------
+        sql : str
+            The SQL query to run.
+        parameters : Iterable[Any]
+            The values bound to the query's placeholders.
+
+        Returns
+        -------
+        List[Tuple[Any, ...]]
+            The resulting rows.
+        """
+        return self.connection.execute(sql, tuple(parameters)).fetchall()
@@ -0,0 +1,272 @@
+"""
+This module provides the DiceExpression class and roll function to parse, roll, \
+and calculate exact probabilities of dice expressions such as '2d6', '4d10x12', and '1d4+3'.
+"""
+
+import re
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+_termPattern = re.compile(r"([+-]?)(?:(\d*)d(\d+)|(\d+))")
+
+
+class DiceExpression:
+    """
+    Provides sampling and exact distributions for a dice expression.
+        Expressions are sums and differences of dice ('NdS', N defaults to 1) and whole numbers, \
+        optionally followed by 'xM' to multiply the total, ignoring spaces and case.
+        The exact distribution is built once by convolving the distribution of each die, \
+        and every roll is drawn by inverting its cumulative distribution, \
+        so any number of rolls costs one uniform random draw each.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        if re.search(r"\d\s+\d", expression):
+            raise ValueError(f"Dice expression: {expression} could not be parsed.")
+        text = re.sub(r"\s+", "", expression).lower()
+        text, times, multiplier = text.partition("x")
+        if times and not multiplier.isdecimal():
+            raise ValueError(f"Dice expression: {expression} could not be parsed.")
+        self.multiplier = int(multiplier) if times else 1
+        terms = list(_termPattern.finditer(text))
+        # Every term after the first must be joined by a sign, and together they must cover the text
+        if (
+            not terms
+            or "".join(term.group(0) for term in terms) != text
+            or any(term.group(1) == "" for term in terms[1:])
+        ):
+            raise ValueError(f"Dice expression: {expression} could not be parsed.")
+        # Convolve every die into one probability mass function starting at self.minimum
+        self.minimum = 0
+        pmf = np.ones(1)
+        for term in terms:
+            sign = -1 if term.group(1) == "-" else 1
+            if term.group(4) is not None:
+                self.minimum += sign * int(term.group(4))
+                continue
+            count, sides = int(term.group(2) or 1), int(term.group(3))
+            if sides < 1:
+                raise ValueError(f"Dice expression: {expression} has a die with no sides.")
+            die = np.full(sides, 1 / sides)
+            for _ in range(count):
+                pmf = np.convolve(pmf, die)
+            self.minimum += count if sign == 1 else -count * sides
+        self.pmf = pmf
+        self._cdf = np.cumsum(pmf)
+        self._cdf[-1] = 1.0
+
+    def __str__(self):
+        return self.expression
+
+    def __repr__(self):
+        return f"DiceExpression({self.expression!r})"
+
+    @property
+    def values(self) -> NDArray[np.int64]:
+        """
+        The possible results of the expression, in the same order as pmf.
+        """
+        return (self.minimum + np.arange(len(self.pmf))) * self.multiplier
+
+    def distribution(self) -> Tuple[NDArray[np.int64], NDArray[np.float64]]:
+        """
+        Provides the exact probability of every possible result of the expression.
+
+        Returns
+        -------
+        Tuple[NDArray[np.int64], NDArray[np.float64]]
+            The possible results and the probability of each.
+        """
+        return self.values, self.pmf
+
+    def mean(self) -> float:
+        """
+        Calculates the expected result of the expression.
+
+        Returns
+        -------
+        float
+            The mean of the expression's distribution.
+        """
+        return float(np.dot(self.values, self.pmf))
+
+    def fromUniform(self, uniforms: float | NDArray[np.float64]) -> int | NDArray[np.int64]:
+        """
+        Converts uniform random numbers in [0, 1) into results of the expression.
+
+        Parameters
+        ----------
+        uniforms : float | NDArray[np.float64]
+            The uniform random numbers to convert.
+
+        Returns
+        -------
+        int | NDArray[np.int64]
+            The result for each uniform random number.
+        """
+        results = (self.minimum + np.searchsorted(self._cdf, uniforms, side="right")) * self.multiplier
+        return int(results) if np.ndim(results) == 0 else results
+
+    def sample(
+        self, size: int | Tuple[int, ...] | None = None, rng: np.random.Generator | None = None
+    ) -> int | NDArray[np.int64]:
+        """
+        Rolls the expression.
+
+        Parameters
+        ----------
+        size : int | Tuple[int, ...] | None
+            The shape of the array of rolls to return.
+            Defaults to a single roll returned as an int.
+        rng : numpy.random.Generator | None
+            The random number generator to draw from.
+            Defaults to numpy's global random state.
+
+        Returns
+        -------
+        int | NDArray[np.int64]
+            The result of each roll.
+        """
+        return self.fromUniform((np.random if rng is None else rng).random(size))
+
+
+@lru_cache(maxsize=256)
+def compileDice(expression: str) -> DiceExpression:
+    """
+    Parses a dice expression, reusing the result for expressions parsed before.
+
+    Parameters
+    ----------
+    expression : str
+        The dice expression, such as '2d6', '4d10x12', or '1d4+3'.
+
+    Returns
+    -------
+    DiceExpression
+        The parsed expression.
+    """
+    return DiceExpression(expression)
+
+
+def roll(
+    expression: str,
+    size: int | Tuple[int, ...] | None = None,
+    rng: np.random.Generator | None = None,
+) -> int | NDArray[np.int64]:
+    """
+    Rolls a dice expression.
+
+    Parameters
+    ----------
+    expression : str
+        The dice expression, such as '2d6', '4d10x12', or '1d4+3'.
+    size : int | Tuple[int, ...] | None
+        The shape of the array of rolls to return.
+        Defaults to a single roll returned as an int.
+    rng : numpy.random.Generator | None
+        The random number generator to draw from.
+        Defaults to numpy's global random state.
+
+    Returns
+    -------
+    int | NDArray[np.int64]
+        The result of each roll.
+    """
+    return compileDice(expression).sample(size, rng)
+
+
+class RandomBuffer:
+    """
+    Provides uniform random numbers and dice rolls drawn ahead of time in large blocks.
+        Drawing a few values at a time from numpy costs microseconds of overhead per call, \
+        so the buffer draws blockSize values at once and hands them out as python floats and ints.
+        Uniforms and each dice expression are drawn from separate blocks of one seeded generator, \
+        so the sequence of values returned is reproducible from the seed.
+    """
+
+    def __init__(self, seed: int | Sequence[int] | None = None, blockSize: int = 4096):
+        self.blockSize = blockSize
+        self.reseed(seed)
+
+    def reseed(self, seed: int | Sequence[int] | None = None):
+        """
+        Discards every buffered value and restarts the generator from a seed.
+
+        Parameters
+        ----------
+        seed : int | Sequence[int] | None
+            The seed for the generator.
+            Defaults to fresh entropy from the operating system.
+
+        Returns
+        -------
+        None if the generator was successfully reseeded.
+        """
+        self.seed = seed
+        self.seedSequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seedSequence)
+        self._uniforms: list = []
+        self._rolls: dict = {}
+
+    def random(self, size: int | None = None) -> float | list:
+        """
+        Returns uniform random numbers in [0, 1).
+
+        Parameters
+        ----------
+        size : int | None
+            The number of values to return.
+            Defaults to a single value returned as a float.
+
+        Returns
+        -------
+        float | list
+            The uniform random numbers.
+        """
+        count = 1 if size is None else size
+        if len(self._uniforms) < count:
+            # Values are handed out from the end of the list, so new blocks go in front
+            self._uniforms = self.rng.random(max(self.blockSize, count)).tolist() + self._uniforms
+        if size is None:
+            return self._uniforms.pop()
+        values = self._uniforms[-count:]
+        del self._uniforms[-count:]
+        return values
+
+    def spawn(self) -> np.random.Generator:
+        """
+        Creates an independent generator for bulk draws, such as vectorized simulations, \
+        without drawing from the buffer's generator.
+            Generators are spawned from the buffer's seed in order, \
+            so they are reproducible from the seed and the number of generators spawned before.
+
+        Returns
+        -------
+        numpy.random.Generator
+            A new generator.
+        """
+        return np.random.default_rng(self.seedSequence.spawn(1)[0])
+
+    def roll(self, expression: DiceExpression) -> int:
+        """
+        Returns a roll of a dice expression.
+
+        Parameters
+        ----------
+        expression : DiceExpression
+            The compiled dice expression to roll.
+
+        Returns
+        -------
+        int
+            The result of the roll.
+        """
+        rolls = self._rolls.get(expression.expression)
+        if not rolls:
+            rolls = expression.sample(self.blockSize, self.rng).tolist()
+            self._rolls[expression.expression] = rolls
+        return rolls.pop()
@@ -0,0 +1,337 @@
+"""
+This module provides the OutputWriter class to write the structured records produced by tools \
+as plain text, TSV, JSON Lines, or a compact binary format through one buffered stream, \
+and the readRecords function to read the binary format back.
+"""
+
+import io
+import json
+import os
+import struct
+import sys
+from typing import IO, Any, Dict, Iterable, Iterator, Literal, Tuple
+
+import numpy as np
+
+type _PathLikeType = str | bytes | os.PathLike
+type _FormatType = Literal["text", "tsv", "jsonl", "binary"]
+type _StyleType = Literal["underline"] | None
+
+outputFormats = ("text", "tsv", "jsonl", "binary")
+# Binary files start with a signature and version byte, followed by schema and data records
+_binarySignature = b"DMTR\x01"
+_schemaTag = b"S"
+_recordTag = b"R"
+_styles = {"underline": "\x1b[4m{}\x1b[m"}
+
+
+def _plain(value: Any) -> Any:
+    # numpy scalars are converted so they format and serialize like python values
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _tsvValue(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value).replace("\t", " ").replace("\n", " ")
+
+
+def _packString(text: str, lengthFormat: str = "<B") -> bytes:
+    data = text.encode()
+    return struct.pack(lengthFormat, len(data)) + data
+
+
+def _packValue(value: Any) -> bytes:
+    if value is None:
+        return b"n"
+    if isinstance(value, bool):
+        return b"?" + struct.pack("<B", value)
+    if isinstance(value, int):
+        return b"i" + struct.pack("<q", value)
+    if isinstance(value, float):
+        return b"f" + struct.pack("<d", value)
+    return b"s" + _packString(str(value), "<I")
+
+
+class OutputWriter:
+    """
+    Provides buffered writing of structured records in one of several formats.
+        Each record has a kind, such as 'treasure' or 'weather', and named fields. \
+        'text' writes each record's human readable text, 'tsv' writes a header row and one row per record, \
+        'jsonl' writes one JSON object per record, and 'binary' writes typed values \
+        with each kind's field names stored once.
+        A TSV table holds a single kind of record, so writing a second kind or other fields raises a ValueError \
+        before any of that record is buffered. \
+        Tools that write several kinds can be limited to one with kinds, and a TSV writer given several kinds raises at once.
+        Text only lines, such as table headings, are written in 'text' format and skipped otherwise. \
+        ANSI styling is only applied when writing to a terminal.
+        Encoded records are collected in memory and written to the stream once bufferSize bytes are waiting, \
+        so the cost of writing does not grow with the number of records.
+    """
+
+    def __init__(
+        self,
+        output: _PathLikeType | IO | None = None,
+        fileFormat: _FormatType = "text",
+        color: bool | None = None,
+        bufferSize: int = 1 << 16,
+        kinds: Iterable[str] | None = None,
+    ):
+        if fileFormat not in outputFormats:
+            raise ValueError(f"Unsupported output format: {fileFormat}")
+        self.fileFormat = fileFormat
+        self.bufferSize = bufferSize
+        self.kinds = None if kinds is None else frozenset(kinds)
+        if fileFormat == "tsv" and self.kinds is not None and len(self.kinds) != 1:
+            raise ValueError(f"TSV output holds one kind of record, but kinds {sorted(self.kinds)} were given.")
+        self._ownsStream = isinstance(output, (str, bytes, os.PathLike))
+        if self._ownsStream:
+            self.stream = open(output, "wb")
+        else:
+            output = sys.stdout if output is None else output
+            # Write encoded bytes to the binary buffer under text streams such as stdout
+            if isinstance(output, io.TextIOBase) and hasattr(output, "buffer"):
+                output.flush()
+                output = output.buffer
+            self.stream = output
+        self._isText = isinstance(self.stream, io.TextIOBase)
+        if self._isText and fileFormat == "binary":
+            raise ValueError("The binary output format can not be written to a text stream.")
+        self.color = (
+            bool(getattr(self.stream, "isatty", lambda: False)()) if color is None else color
+        )
+        self._chunks: list = []
+        self._pendingSize = 0
+        self._schemas: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        self._lastSchema: Tuple[str, Tuple[str, ...]] | None = None
+        if fileFormat == "binary":
+            self._append(_binarySignature)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _append(self, data: bytes):
+        self._chunks.append(data)
+        self._pendingSize += len(data)
+        if self._pendingSize >= self.bufferSize:
+            self._drain()
+
+    def _drain(self):
+        # Write every waiting chunk to the stream in one call
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self.stream.write(data.decode() if self._isText else data)
+            self._chunks = []
+            self._pendingSize = 0
+
+    def _schema(self, kind: str, names: Tuple[str, ...]) -> int | None:
+        # Write the TSV header or a binary schema record the first time a kind and its fields are seen
+        schema = (kind, names)
+        if self.fileFormat == "tsv":
+            if self._lastSchema is None:
+                self._append(("\t".join(names) + "\n").encode())
+            elif schema != self._lastSchema:
+                raise ValueError(
+                    f"TSV output holds one kind of record, but '{kind}' records with fields {list(names)} "
+                    f"were written after '{self._lastSchema[0]}' records with fields {list(self._lastSchema[1])}."
+                )
+        self._lastSchema = schema
+        if self.fileFormat != "binary":
+            return None
+        schemaId = self._schemas.get(schema)
+        if schemaId is None:
+            schemaId = self._schemas[schema] = len(self._schemas)
+            self._append(
+                _schemaTag
+                + struct.pack("<H", schemaId)
+                + _packString(kind)
+                + struct.pack("<B", len(names))
+                + b"".join(_packString(name) for name in names)
+            )
+        return schemaId
+
+    def _encodeRow(self, kind: str, schemaId: int | None, names: Tuple[str, ...], values: Tuple[Any, ...]) -> bytes:
+        if self.fileFormat == "tsv":
+            return ("\t".join(_tsvValue(value) for value in values) + "\n").encode()
+        if self.fileFormat == "jsonl":
+            return (json.dumps({"kind": kind, **dict(zip(names, values))}) + "\n").encode()
+        return _recordTag + struct.pack("<H", schemaId) + b"".join(_packValue(value) for value in values)
+
+    def styled(self, text: str, style: _StyleType = None) -> str:
+        """
+        Applies ANSI styling to text if the output is a terminal.
+
+        Parameters
+        ----------
+        text : str
+            The text to style.
+        style : 'underline' | None
+            The style to apply.
+            Defaults to no styling.
+
+        Returns
+        -------
+        str
+            The styled text.
+        """
+        if style is None or not self.color:
+            return text
+        return _styles[style].format(text)
+
+    def text(self, line: str, style: _StyleType = None):
+        """
+        Writes a line that is only part of the human readable output, such as a table heading.
+
+        Parameters
+        ----------
+        line : str
+            The line to write.
+        style : 'underline' | None
+            If present, the style applied when writing to a terminal.
+
+        Returns
+        -------
+        None if the line was successfully buffered.
+        """
+        if self.fileFormat == "text":
+            self._append((self.styled(line, style) + "\n").encode())
+
+    def write(self, kind: str, text: str | None = None, style: _StyleType = None, **fields: Any):
+        """
+        Writes one structured record.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of record, such as 'treasure' or 'weather'.
+        text : str | None
+            If present, the human readable line written in 'text' format.
+        style : 'underline' | None
+            If present, the style applied to text when writing to a terminal.
+        **fields : Any
+            The values of the record. Values should be None, bool, int, float, or str.
+
+        Returns
+        -------
+        None if the record was successfully buffered, or skipped as a kind not in kinds.
+        """
+        if self.kinds is not None and kind not in self.kinds:
+            return
+        if self.fileFormat == "text":
+            if text is not None:
+                self.text(text, style)
+            return
+        names = tuple(fields)
+        schemaId = self._schema(kind, names)
+        self._append(self._encodeRow(kind, schemaId, names, tuple(_plain(value) for value in fields.values())))
+
+    def writeColumns(self, kind: str, **columns: Any):
+        """
+        Writes one structured record per row of equal length columns, such as the fields of a structured array. \
+        Nothing is written in 'text' format.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of every record.
+        **columns : ArrayLike
+            The values of each field, one per record.
+
+        Returns
+        -------
+        None if the records were successfully buffered, or skipped as a kind not in kinds.
+        """
+        if self.fileFormat == "text" or (self.kinds is not None and kind not in self.kinds):
+            return
+        names = tuple(columns)
+        schemaId = self._schema(kind, names)
+        rows = zip(*(np.asarray(column).tolist() for column in columns.values()))
+        self._append(b"".join(self._encodeRow(kind, schemaId, names, row) for row in rows))
+
+    def flush(self):
+        """
+        Writes every buffered record to the stream and flushes it.
+
+        Returns
+        -------
+        None if the records were successfully written.
+        """
+        self._drain()
+        self.stream.flush()
+
+    def close(self):
+        """
+        Writes every buffered record, closing the stream if the writer opened it.
+
+        Returns
+        -------
+        None if the writer was successfully closed.
+        """
+        self.flush()
+        if self._ownsStream:
+            self.stream.close()
+
+
+def readRecords(file: _PathLikeType) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Reads the records of a file written in the 'binary' format.
+
+    Parameters
+    ----------
+    file : str | bytes | os.PathLike
+        The binary file to read.
+
+    Returns
+    -------
+    Iterator[Tuple[str, Dict[str, Any]]]
+        The kind and fields of each record in the order they were written.
+    """
+    with open(file, "rb") as recordFile:
+        data = recordFile.read()
+    if not data.startswith(_binarySignature):
+        raise ValueError(f"File: {file} is not a binary record file.")
+    position = len(_binarySignature)
+    schemas: Dict[int, Tuple[str, Tuple[str, ...]]] = {}
+
+    def readString(lengthFormat: str = "<B") -> str:
+        nonlocal position
+        (length,) = struct.unpack_from(lengthFormat, data, position)
+        position += struct.calcsize(lengthFormat)
+        text = data[position : position + length].decode()
+        position += length
+        return text
+
+    while position < len(data):
+        tag = data[position : position + 1]
+        (schemaId,) = struct.unpack_from("<H", data, position + 1)
+        position += 3
+        if tag == _schemaTag:
+            kind = readString()
+            count = data[position]
+            position += 1
+            schemas[schemaId] = (kind, tuple(readString() for _ in range(count)))
+            continue
+        kind, names = schemas[schemaId]
+        values = []
+        for _ in names:
+            valueTag = data[position : position + 1]
+            position += 1
+            if valueTag == b"n":
+                values.append(None)
+            elif valueTag == b"?":
+                values.append(bool(data[position]))
+                position += 1
+            elif valueTag == b"i":
+                values.append(struct.unpack_from("<q", data, position)[0])
+                position += 8
+            elif valueTag == b"f":
+                values.append(struct.unpack_from("<d", data, position)[0])
+                position += 8
+            else:
+                values.append(readString("<I"))
+        yield kind, dict(zip(names, values))
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+This module provides access to the PlayerManager class to track player characters, \
+their parties, and their levels for use by other tools.
+"""
+
+import argparse as ap
+import os
+from typing import Dict, Iterable, List, Set, Tuple
+
+type _PathLikeType = str | bytes | os.PathLike
+
+playersFile = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "savedData", "players.tsv"
+)
+_header = "name\tparty\tlevel\n"
+
+
+class PlayerManager:
+    """
+    Provides methods for reading, updating, and querying the player roster stored in a TSV file.
+        The file is a log of changes: each row sets a player's party and level, \
+        later rows replace earlier rows for the same name, and a row with level 0 removes the player. \
+        The roster is read once, changes are appended as single rows, \
+        and compact rewrites the file with only the current roster.
+        Players are indexed by name, party, and level, and per party totals are kept up to date, \
+        so party size and average level are constant time lookups.
+    """
+
+    def __init__(self, file: _PathLikeType = playersFile):
+        self.file = file
+        self.players: Dict[str, Tuple[str, int]] = {}
+        self.byParty: Dict[str, Set[str]] = {}
+        self.byLevel: Dict[int, Set[str]] = {}
+        self._partyLevelTotals: Dict[str, int] = {}
+        if not os.path.isfile(file):
+            with open(file, "w") as playerFile:
+                playerFile.write(_header)
+        with open(file) as playerFile:
+            playerFile.readline()
+            for line in playerFile:
+                if line.strip():
+                    name, party, level = line.rstrip("\n").split("\t")
+                    self._apply(name, party, int(level))
+
+    def __len__(self):
+        return len(self.players)
+
+    def __contains__(self, name: str):
+        return name in self.players
+
+    def _apply(self, name: str, party: str, level: int):
+        # Remove the player's previous entry from every index
+        if name in self.players:
+            oldParty, oldLevel = self.players.pop(name)
+            self.byParty[oldParty].discard(name)
+            self.byLevel[oldLevel].discard(name)
+            self._partyLevelTotals[oldParty] -= oldLevel
+            if not self.byParty[oldParty]:
+                del self.byParty[oldParty], self._partyLevelTotals[oldParty]
+            if not self.byLevel[oldLevel]:
+                del self.byLevel[oldLevel]
+        if level == 0:
+            return
+        self.players[name] = (party, level)
+        self.byParty.setdefault(party, set()).add(name)
+        self.byLevel.setdefault(level, set()).add(name)
+        self._partyLevelTotals[party] = self._partyLevelTotals.get(party, 0) + level
+
+    def updatePlayers(self, records: Iterable[Tuple[str, str, int]]):
+        """
+        Sets the party and level of many players, appending all changes to the file in one write.
+
+        Parameters
+        ----------
+        records : Iterable[Tuple[str, str, int]]
+            The (name, party, level) of each player. A level of 0 removes the player.
+
+        Returns
+        -------
+        None if the players were successfully updated.
+        """
+        records = [(name, party, int(level)) for name, party, level in records]
+        # Check every record before any are applied, so a rejected record changes nothing
+        for name, party, level in records:
+            if "\t" in name or "\n" in name or "\t" in party or "\n" in party:
+                raise ValueError("Player and party names can not contain tabs or newlines.")
+            if level < 0:
+                raise ValueError(f"Player: {name} can not have a negative level.")
+        lines = []
+        for name, party, level in records:
+            self._apply(name, party, level)
+            lines.append(f"{name}\t{party}\t{level}\n")
+        with open(self.file, "a") as playerFile:
+            playerFile.writelines(lines)
+
+    def addPlayer(self, name: str, party: str, level: int = 1):
+        """
+        Adds a player to the roster, or replaces the party and level of an existing player.
+
+        Parameters
+        ----------
+        name : str
+            The name of the player character.
+        party : str
+            The name of the party the player belongs to.
+        level : int
+            The level of the player character.
+            Defaults to 1
+
+        Returns
+        -------
+        None if the player was successfully added.
+        """
+        self.updatePlayers([(name, party, level)])
+
+    def setLevel(self, name: str, level: int):
+        """
+        Changes the level of a player in the roster.
+
+        Parameters
+        ----------
+        name : str
+            The name of the player character.
+        level : int
+            The new level of the player character.
+
+        Returns
+        -------
+        None if the player was successfully updated.
+        """
+        self.updatePlayers([(name, self.player(name)[0], level)])
+
+    def setParty(self, name: str, party: str):
+        """
+        Moves a player in the roster to another party.
+
+        Parameters
+        ----------
+        name : str
+            The name of the player character.
+        party : str
+            The name of the new party.
+
+        Returns
+        -------
+        None if the player was successfully updated.
+        """
+        self.updatePlayers([(name, party, self.player(name)[1])])
+
+    def removePlayer(self, name: str):
+        """
+        Removes a player from the roster.
+
+        Parameters
+        ----------
+        name : str
+            The name of the player character.
+
+        Returns
+        -------
+        None if the player was successfully removed.
+        """
+        self.updatePlayers([(name, self.player(name)[0], 0)])
+
+    def compact(self):
+        """
+        Rewrites the file with one row per current player, discarding replaced and removed rows.
+
+        Returns
+        -------
+        None if the file was successfully rewritten.
+        """
+        temporaryFile = f"{os.fsdecode(self.file)}.tmp"
+        with open(temporaryFile, "w") as playerFile:
+            playerFile.write(_header)
+            playerFile.writelines(
+                f"{name}\t{party}\t{level}\n"
+                for name, (party, level) in self.players.items()
+            )
+        os.replace(temporaryFile, self.file)
+
+    def player(self, name: str) -> Tuple[str, int]:
+        """
+        Looks up a player in the roster.
+
+        Parameters
+        ----------
+        name : str
+            The name of the player character.
+
+        Returns
+        -------
+        Tuple[str, int]
+            The party and level of the player.
+        """
+        if name not in self.players:
+            raise KeyError(f"Player: {name} was not found in {self.file}.")
+        return self.players[name]
+
+    def party(self, party: str) -> List[str]:
+        """
+        Lists the players in a party.
+
+        Parameters
+        ----------
+        party : str
+            The name of the party.
+
+        Returns
+        -------
+        List[str]
+            The sorted names of the players in the party.
+        """
+        return sorted(self.byParty.get(party, ()))
+
+    def playersAtLevel(self, minLevel: int, maxLevel: int | None = None) -> List[str]:
+        """
+        Lists the players within a range of levels.
+
+        Parameters
+        ----------
+        minLevel : int
+            The lowest level to include.
+        maxLevel : int | None
+            The highest level to include.
+            Defaults to minLevel
+
+        Returns
+        -------
+        List[str]
+            The sorted names of the matching players.
+        """
+        maxLevel = minLevel if maxLevel is None else maxLevel
+        return sorted(
+            name
+            for level, names in self.byLevel.items()
+            if minLevel <= level <= maxLevel
+            for name in names
+        )
+
+    def partySize(self, party: str) -> int:
+        """
+        Counts the players in a party.
+
+        Parameters
+        ----------
+        party : str
+            The name of the party.
+
+        Returns
+        -------
+        int
+            The number of players in the party.
+        """
+        return len(self.byParty.get(party, ()))
+
+    def averageLevel(self, party: str) -> float:
+        """
+        Calculates the average level of the players in a party.
+
+        Parameters
+        ----------
+        party : str
+            The name of the party.
+
+        Returns
+        -------
+        float
+            The average level of the party.
+        """
+        if party not in self.byParty:
+            raise KeyError(f"Party: {party} was not found in {self.file}.")
+        return self._partyLevelTotals[party] / len(self.byParty[party])
+
+    def partyParameters(self, party: str) -> Tuple[int, int]:
+        """
+        Provides the party size and average level used by other tools such as lootGenerator.
+
+        Parameters
+        ----------
+        party : str
+            The name of the party.
+
+        Returns
+        -------
+        Tuple[int, int]
+            The number of players and the average level rounded to the nearest level.
+        """
+        return self.partySize(party), int(self.averageLevel(party) + 0.5)
+
+
+def parseargs():
+    parser = ap.ArgumentParser(description="Manages the Player Roster")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    addParser = subparsers.add_parser("add", help="Adds or updates a player.")
+    addParser.add_argument("name", help="Sets the name of the player character.")
+    addParser.add_argument("party", help="Sets the party the player belongs to.")
+    addParser.add_argument("level", type=int, help="Sets the level of the player character.")
+    removeParser = subparsers.add_parser("remove", help="Removes a player.")
+    removeParser.add_argument("name", help="Sets the name of the player character.")
+    partyParser = subparsers.add_parser("party", help="Lists the players in a party.")
+    partyParser.add_argument("party", help="Sets the name of the party.")
+    subparsers.add_parser("compact", help="Rewrites the roster file without old changes.")
+    return parser.parse_args()
+
+
+def main():
+    args = parseargs()
+    manager = PlayerManager()
+    if args.command == "add":
+        manager.addPlayer(args.name, args.party, args.level)
+    elif args.command == "remove":
+        manager.removePlayer(args.name)
+    elif args.command == "party":
+        print(f"## Party {args.party}: {manager.partySize(args.party)} players")
+        for name in manager.party(args.party):
+            print(f"{name}\tLevel {manager.player(name)[1]}")
+    elif args.command == "compact":
+        manager.compact()
+
+
+if __name__ == "__main__":
+    main()
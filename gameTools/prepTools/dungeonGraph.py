@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+This module provides functions to distribute generated treasure over the rooms of a dungeon graph.
+"""
+
+import argparse as ap
+import os
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from lootGenerator import lootForLevel
+
+type _PathLikeType = str | bytes | os.PathLike
+type _AdjacencyType = Sequence[Sequence[int]] | tuple[NDArray[np.int64], NDArray[np.int64]]
+
+# Graph treasure layout, one row per room receiving treasure
+roomTreasureDtype = np.dtype(
+    [
+        ("room", np.int64),
+        ("depth", np.int32),
+        ("value", np.float64),
+        ("denomination", "U2"),
+    ]
+)
+
+
+def toCsr(adjacency: _AdjacencyType) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+    """
+    Converts an adjacency list to compressed sparse row arrays.
+
+    Parameters
+    ----------
+    adjacency : Sequence[Sequence[int]] | tuple[NDArray, NDArray]
+        Either the neighbouring rooms of each room, or an (indptr, indices) pair, \
+        where the neighbours of room i are indices[indptr[i]:indptr[i + 1]].
+
+    Returns
+    -------
+    tuple[NDArray[np.int64], NDArray[np.int64]]
+        The (indptr, indices) arrays of the graph.
+    """
+    if isinstance(adjacency, tuple) and len(adjacency) == 2:
+        return np.asarray(adjacency[0], np.int64), np.asarray(adjacency[1], np.int64)
+    counts = np.fromiter((len(neighbours) for neighbours in adjacency), np.int64, len(adjacency))
+    indptr = np.concatenate([[0], np.cumsum(counts)])
+    indices = np.fromiter(
+        (room for neighbours in adjacency for room in neighbours), np.int64, indptr[-1]
+    )
+    return indptr, indices
+
+
+def loadEdges(file: _PathLikeType, roomCount: int | None = None) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+    """
+    Loads an undirected dungeon graph from a TSV file with one pair of connected rooms per line.
+
+    Parameters
+    ----------
+    file : str | bytes | os.PathLike
+        The edge list file to be read.
+    roomCount : int | None
+        The number of rooms in the dungeon, which must be above the highest room number in the file.
+        Defaults to one more than the highest room number in the file.
+
+    Returns
+    -------
+    tuple[NDArray[np.int64], NDArray[np.int64]]
+        The (indptr, indices) arrays of the graph.
+    """
+    edges = np.loadtxt(file, dtype=np.int64, delimiter="\t", ndmin=2)
+    # Store each edge in both directions, grouped by source room
+    source = np.concatenate([edges[:, 0], edges[:, 1]])
+    target = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.argsort(source, kind="stable")
+    highestRoom = int(source.max(initial=-1))
+    if roomCount is None:
+        roomCount = highestRoom + 1
+    elif roomCount <= highestRoom:
+        raise ValueError(f"Room count: {roomCount} does not include room {highestRoom} from {file}.")
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(source, minlength=roomCount))])
+    return indptr, target[order]
+
+
+def roomDepths(
+    indptr: NDArray[np.int64], indices: NDArray[np.int64], entrance: int = 0
+) -> NDArray[np.int32]:
+    """
+    Calculates the number of rooms between the entrance and every room by breadth first search.
+        Each step expands the whole frontier at once, so the cost is one set of array operations per depth.
+
+    Parameters
+    ----------
+    indptr : NDArray[np.int64]
+        The row pointer array of the graph.
+    indices : NDArray[np.int64]
+        The neighbour array of the graph.
+    entrance : int
+        The room the party enters the dungeon from.
+        Defaults to 0
+
+    Returns
+    -------
+    NDArray[np.int32]
+        The depth of each room, or -1 for rooms that can not be reached from the entrance.
+    """
+    depths = np.full(len(indptr) - 1, -1, dtype=np.int32)
+    depths[entrance] = 0
+    frontier = np.array([entrance], dtype=np.int64)
+    depth = 0
+    while len(frontier):
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        # Gather every neighbour slice of the frontier as one index array
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        neighbours = indices[offsets]
+        frontier = np.unique(neighbours[depths[neighbours] < 0])
+        depth += 1
+        depths[frontier] = depth
+    return depths
+
+
+def distributeTreasure(
+    totalTreasure: float,
+    adjacency: _AdjacencyType,
+    entrance: int = 0,
+    tags: ArrayLike | None = None,
+    tagWeights: ArrayLike | None = None,
+    depthExponent: float = 1.0,
+    deadEndWeight: float = 2.0,
+    treasureCount: int | None = None,
+) -> NDArray:
+    """
+    Distributes treasure over the rooms of a dungeon graph.
+        As in generateTreasure, the nth treasure is worth totalTreasure * 0.5 ** n, \
+        but treasures are placed in rooms drawn by weight instead of in room order. \
+        A room's weight is (depth + 1) ** depthExponent, multiplied by deadEndWeight for dead ends \
+        and by the weight of its tag. Rooms that can not be reached are never chosen.
+
+    Parameters
+    ----------
+    totalTreasure : float
+        The value of all treasure in the dungeon in SP.
+    adjacency : Sequence[Sequence[int]] | tuple[NDArray, NDArray]
+        The neighbouring rooms of each room, or an (indptr, indices) pair.
+    entrance : int
+        The room the party enters the dungeon from.
+        Defaults to 0
+    tags : ArrayLike | None
+        If present, an integer tag for each room, such as 0: Corridor, 1: Chamber, 2: Vault.
+    tagWeights : ArrayLike | None
+        The weight of each tag value. Required if tags is present.
+    depthExponent : float
+        Sets how strongly treasure favors rooms deeper in the dungeon.
+        Defaults to 1.0
+    deadEndWeight : float
+        Multiplies the weight of rooms with a single connection.
+        Defaults to 2.0
+    treasureCount : int | None
+        Sets the maximum number of treasures to place.
+        Defaults to every treasure worth at least 0.01 SP.
+
+    Returns
+    -------
+    NDArray[roomTreasureDtype]
+        A structured array of (room, depth, value, denomination) rows for the rooms receiving treasure, \
+        largest treasure first.
+    """
+    indptr, indices = toCsr(adjacency)
+    depths = roomDepths(indptr, indices, entrance)
+    weights = np.where(depths >= 0, (depths + 1.0) ** depthExponent, 0.0)
+    weights[(np.diff(indptr) == 1) & (depths > 0)] *= deadEndWeight
+    if tags is not None:
+        weights *= np.asarray(tagWeights, dtype=np.float64)[np.asarray(tags)]
+    # Only treasures that round to at least 0.01 SP are placed
+    maxCount = int(np.floor(np.log2(max(totalTreasure, 0.005) / 0.005)))
+    treasureCount = maxCount if treasureCount is None else min(treasureCount, maxCount)
+    treasureCount = min(treasureCount, int(np.count_nonzero(weights)))
+    # Weighted sampling without replacement: the smallest exponential keys scaled by weight win
+    with np.errstate(divide="ignore"):
+        keys = np.random.exponential(size=len(weights)) / weights
+    chosen = np.argpartition(keys, min(treasureCount, len(keys) - 1))[:treasureCount]
+    chosen = chosen[np.argsort(keys[chosen])]
+    values = np.round(totalTreasure * 0.5 ** np.arange(1, treasureCount + 1), 2)
+    treasure = np.empty(treasureCount, dtype=roomTreasureDtype)
+    treasure["room"] = chosen
+    treasure["depth"] = depths[chosen]
+    # Treasures worth less than one SP are given in CP
+    isCopper = values < 1
+    treasure["value"] = np.where(isCopper, np.round(values * 100, 2), values)
+    treasure["denomination"] = np.where(isCopper, "CP", "SP")
+    return treasure
+
+
+def parseargs():
+    parser = ap.ArgumentParser(description='Distributes Level Appropriate Loot over a Dungeon Graph')
+    parser.add_argument('edges',help="Sets the TSV file of connected room pairs describing the dungeon.")
+    parser.add_argument('playerCount',type=int,help="Sets the number of players the dungeon is designed for.")
+    parser.add_argument('averageLevel',type=int,help="Sets the average player level the dungeon is designed for.")
+    parser.add_argument('-d', '--difficulty',default=1.0,type=float,help='If present, multiplies the treasure reward by the provided difficulty modifier.')
+    parser.add_argument('-e', '--entrance',default=0,type=int,help='Sets the room the party enters the dungeon from.')
+    parser.add_argument('-t', '--table',default='standard',help='Sets the named loot table from savedData/lootByLevel.tsv to use.')
+    return parser.parse_args()
+
+
+def main():
+    args = parseargs()
+    totalTreasure = float(lootForLevel(args.averageLevel,args.table) * args.playerCount * args.difficulty * (1 + 0.1 * (np.random.random() - 0.5)))
+    treasure = distributeTreasure(totalTreasure, loadEdges(args.edges), args.entrance)
+    print("## Room\tDepth\tTreasure Value")
+    for room, depth, value, denomination in treasure.tolist():
+        print(f"## Room {room}\t{depth}\t{value} {denomination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+This module provides functions to estimate the wealth a party collects over a campaign \
+by simulating many campaigns of generated treasure at once.
+"""
+
+import argparse as ap
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from lootGenerator import loadLootTable, lootForLevel
+
+
+def sessionLevels(
+    sessions: int,
+    startLevel: int,
+    sessionsPerLevel: int,
+    table: str = "standard",
+    maxLevel: int | None = None,
+) -> NDArray[np.int64]:
+    """
+    Calculates the average party level of each session.
+        Every level reached must be covered by the loot table, as checked by lootForLevel.
+
+    Parameters
+    ----------
+    sessions : int
+        The number of sessions in the campaign.
+    startLevel : int
+        The average party level of the first session.
+    sessionsPerLevel : int
+        The number of sessions the party spends at each level.
+    table : str
+        The name of the loot table to use.
+        Defaults to 'standard'
+    maxLevel : int | None
+        If present, the level the party stops advancing at.
+
+    Returns
+    -------
+    NDArray[np.int64]
+        The average party level of each session.
+    """
+    if maxLevel is not None and startLevel > maxLevel:
+        raise ValueError(f"Start level: {startLevel} is above the maximum level: {maxLevel}.")
+    levels = startLevel + np.arange(sessions) // sessionsPerLevel
+    if maxLevel is not None:
+        levels = np.minimum(levels, maxLevel)
+    # Raises for any level the loot table does not cover
+    lootForLevel(np.unique(levels), table)
+    return levels
+
+
+def highestLevel(table: str = "standard") -> int:
+    """
+    Finds the highest level covered by a loot table, for use as sessionLevels' maxLevel.
+
+    Parameters
+    ----------
+    table : str
+        The name of the loot table to use.
+        Defaults to 'standard'
+
+    Returns
+    -------
+    int
+        The highest level with a value in the table.
+    """
+    return int(np.flatnonzero(~np.isnan(loadLootTable(table)))[-1])
+
+
+def simulateCampaigns(
+    playerCount: int = 4,
+    startLevel: int = 1,
+    sessions: int = 50,
+    sessionsPerLevel: int = 5,
+    dungeonSize: int | tuple[int, int] = (5, 20),
+    difficulty: float = 1.0,
+    campaigns: int = 100000,
+    table: str = "standard",
+    seed: int | None = None,
+    chunkSize: int = 20000,
+    maxLevel: int | None = None,
+) -> NDArray[np.float64]:
+    """
+    Simulates the cumulative treasure collected over many campaigns with one dungeon per session.
+        Each dungeon's treasure follows generateTreasure: the loot table value for the session's level \
+        multiplied by party size, difficulty, and a ±5% randomization, halved in each room. \
+        The rooms' treasure is summed in closed form, so per room rounding to 0.01 SP is ignored.
+
+    Parameters
+    ----------
+    playerCount : int
+        The number of players in the party.
+        Defaults to 4
+    startLevel : int
+        The average party level of the first session.
+        Defaults to 1
+    sessions : int
+        The number of sessions in each campaign.
+        Defaults to 50
+    sessionsPerLevel : int
+        The number of sessions the party spends at each level.
+        Defaults to 5
+    dungeonSize : int | tuple[int, int]
+        The number of rooms in each dungeon, or the inclusive range it is uniformly drawn from.
+        Defaults to (5, 20)
+    difficulty : float
+        The treasure reward multiplier of each dungeon.
+        Defaults to 1.0
+    campaigns : int
+        The number of campaigns to simulate.
+        Defaults to 100000
+    table : str
+        The name of the loot table to use.
+        Defaults to 'standard'
+    seed : int | None
+        If present, seeds the random number generator so results can be reproduced.
+    chunkSize : int
+        Sets the number of campaigns simulated per array operation to bound memory use.
+        Defaults to 20000
+    maxLevel : int | None
+        If present, the level the party stops advancing at.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        A (campaigns, sessions) array of the cumulative treasure in SP after each session.
+    """
+    rng = np.random.default_rng(seed)
+    levels = sessionLevels(sessions, startLevel, sessionsPerLevel, table, maxLevel)
+    baseTreasure = lootForLevel(levels, table) * playerCount * difficulty
+    minSize, maxSize = np.broadcast_to(dungeonSize, 2)
+    wealth = np.empty((campaigns, sessions))
+    for start in range(0, campaigns, chunkSize):
+        chunk = wealth[start : start + chunkSize]
+        totalTreasure = baseTreasure * (1 + 0.1 * (rng.random(chunk.shape) - 0.5))
+        rooms = rng.integers(minSize, maxSize, size=chunk.shape, endpoint=True)
+        # Sum of totalTreasure * 0.5 ** (room + 1) over every room in the dungeon
+        np.cumsum(totalTreasure * (1 - 0.5**rooms), axis=1, out=chunk)
+    return wealth
+
+
+def wealthByLevel(
+    wealth: NDArray[np.float64],
+    levels: NDArray[np.int64],
+    percentiles: ArrayLike = (5, 25, 50, 75, 95),
+) -> tuple[NDArray[np.int64], NDArray[np.float64]]:
+    """
+    Calculates percentiles of the cumulative treasure collected by the end of each level.
+
+    Parameters
+    ----------
+    wealth : NDArray[np.float64]
+        A (campaigns, sessions) array of cumulative treasure from simulateCampaigns.
+    levels : NDArray[np.int64]
+        The average party level of each session from sessionLevels.
+    percentiles : ArrayLike
+        The percentiles to calculate.
+        Defaults to (5, 25, 50, 75, 95)
+
+    Returns
+    -------
+    tuple[NDArray[np.int64], NDArray[np.float64]]
+        The levels reached, and a (levels, percentiles) array of cumulative treasure in SP.
+    """
+    uniqueLevels = np.unique(levels)
+    # Levels never decrease, so the last session at each level is just before the next level starts
+    lastSession = np.searchsorted(levels, uniqueLevels, side="right") - 1
+    return uniqueLevels, np.percentile(wealth[:, lastSession], percentiles, axis=0).T
+
+
+def sensitivity(
+    difficulties: ArrayLike,
+    dungeonSizes: ArrayLike,
+    campaigns: int = 20000,
+    seed: int = 0,
+    **campaignArgs,
+) -> NDArray[np.float64]:
+    """
+    Calculates the median final treasure of a campaign over a grid of difficulties and dungeon sizes.
+        Every grid point reuses the same seed, so differences come from the parameters rather than noise.
+
+    Parameters
+    ----------
+    difficulties : ArrayLike
+        The difficulty multipliers to compare.
+    dungeonSizes : ArrayLike
+        The dungeon sizes to compare.
+    campaigns : int
+        The number of campaigns simulated per grid point.
+        Defaults to 20000
+    seed : int
+        Seeds the random number generator of every grid point.
+        Defaults to 0
+    **campaignArgs
+        Any other arguments accepted by simulateCampaigns.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        A (difficulties, dungeonSizes) array of median final treasure in SP.
+    """
+    difficulties = np.ravel(difficulties)
+    dungeonSizes = np.ravel(dungeonSizes)
+    medians = np.empty((len(difficulties), len(dungeonSizes)))
+    for row, difficulty in enumerate(difficulties):
+        for column, dungeonSize in enumerate(dungeonSizes):
+            wealth = simulateCampaigns(
+                difficulty=float(difficulty),
+                dungeonSize=int(dungeonSize),
+                campaigns=campaigns,
+                seed=seed,
+                **campaignArgs,
+            )
+            medians[row, column] = np.median(wealth[:, -1])
+    return medians
+
+
+def parseargs():
+    parser = ap.ArgumentParser(description='Simulates Treasure Collected over Many Campaigns')
+    parser.add_argument('playerCount',type=int,help="Sets the number of players in the party.")
+    parser.add_argument('-l', '--startLevel',default=1,type=int,help="Sets the average party level of the first session.")
+    parser.add_argument('-s', '--sessions',default=50,type=int,help="Sets the number of sessions in each campaign.")
+    parser.add_argument('-p', '--sessionsPerLevel',default=5,type=int,help="Sets the number of sessions the party spends at each level.")
+    parser.add_argument('--minRooms',default=5,type=int,help="Sets the minimum number of rooms in each dungeon.")
+    parser.add_argument('--maxRooms',default=20,type=int,help="Sets the maximum number of rooms in each dungeon.")
+    parser.add_argument('-d', '--difficulty',default=1.0,type=float,help='Multiplies the treasure reward by the provided difficulty modifier.')
+    parser.add_argument('-c', '--campaigns',default=100000,type=int,help="Sets the number of campaigns to simulate.")
+    parser.add_argument('-t', '--table',default='standard',help='Sets the named loot table from savedData/lootByLevel.tsv to use.')
+    parser.add_argument('--seed',default=None,type=int,help="If present, seeds the simulation so results can be reproduced.")
+    parser.add_argument('--maxLevel',default=None,type=int,help="Sets the level the party stops advancing at. Defaults to the highest level in the loot table.")
+    return parser.parse_args()
+
+
+def main():
+    args = parseargs()
+    maxLevel = highestLevel(args.table) if args.maxLevel is None else args.maxLevel
+    levels = sessionLevels(args.sessions, args.startLevel, args.sessionsPerLevel, args.table, maxLevel)
+    wealth = simulateCampaigns(args.playerCount, args.startLevel, args.sessions, args.sessionsPerLevel, (args.minRooms, args.maxRooms), args.difficulty, args.campaigns, args.table, args.seed, maxLevel=maxLevel)
+    print(f"## Cumulative Treasure over {args.campaigns} campaigns of {args.sessions} sessions for {args.playerCount} players.")
+    print("## Level\t5th\t25th\t50th\t75th\t95th Percentile")
+    for level, values in zip(*wealthByLevel(wealth, levels)):
+        print(f"## Level {level}\t" + "\t".join(f"{value:.2f} SP" for value in values))
+    difficulties = args.difficulty * np.array([0.5, 1.0, 1.5, 2.0])
+    dungeonSizes = np.unique(np.linspace(args.minRooms, args.maxRooms, 4).astype(int))
+    medians = sensitivity(difficulties, dungeonSizes, playerCount=args.playerCount, startLevel=args.startLevel, sessions=args.sessions, sessionsPerLevel=args.sessionsPerLevel, table=args.table, maxLevel=maxLevel)
+    print("## Median Final Treasure by Difficulty and Dungeon Size")
+    print("## Difficulty\t" + "\t".join(f"{size} Rooms" for size in dungeonSizes))
+    for difficulty, row in zip(difficulties, medians):
+        print(f"## {difficulty:g}\t" + "\t".join(f"{value:.2f} SP" for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+This module provides functions to turn treasure values into itemized hoards drawn from an item catalog.
+"""
+
+import argparse as ap
+import os
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from lootGenerator import generateTreasureBatch
+
+type _PathLikeType = str | bytes | os.PathLike
+
+# Catalog layout, one row per item, value in SP
+catalogDtype = np.dtype(
+    [("name", "U64"), ("value", np.float64), ("rarity", np.int8), ("level", np.int16)]
+)
+# Hoard layout, one row per drawn item
+hoardItemDtype = np.dtype(
+    [("hoard", np.int64), ("item", np.int64), ("name", "U64"), ("value", np.float64)]
+)
+# Relative chance of drawing an item by rarity: Common, Uncommon, Rare, Very Rare, Legendary
+defaultRarityWeights = (1.0, 0.5, 0.2, 0.05, 0.01)
+
+
+def loadCatalog(file: _PathLikeType) -> NDArray:
+    """
+    Loads an item catalog TSV with name, value, rarity, and level columns and a header row.
+
+    Parameters
+    ----------
+    file : str | bytes | os.PathLike
+        The catalog file to be read.
+
+    Returns
+    -------
+    NDArray[catalogDtype]
+        A structured array of the catalog items.
+    """
+    return np.loadtxt(
+        file, dtype=catalogDtype, delimiter="\t", skiprows=1, ndmin=1, encoding="utf-8"
+    )
+
+
+class ItemCatalog:
+    """
+    Provides weighted sampling of catalog items by value budget.
+        Items are sorted by value, so the items affordable with a budget are a prefix of the catalog \
+        found by binary search. Sampling weights are stored as cumulative sums over that order, \
+        so a weighted draw restricted to any value range is a second binary search.
+    """
+
+    def __init__(
+        self,
+        catalog: NDArray,
+        rarityWeights: ArrayLike = defaultRarityWeights,
+        levelFalloff: float = 0.75,
+    ):
+        order = np.argsort(catalog["value"], kind="stable")
+        self.catalog = catalog[order]
+        self.values = self.catalog["value"]
+        self.rarityWeights = np.asarray(rarityWeights, dtype=np.float64)
+        self.levelFalloff = levelFalloff
+        self._cumulativeWeights = {}
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def cumulativeWeights(self, averageLevel: int) -> NDArray[np.float64]:
+        """
+        Calculates the cumulative sampling weights of the value sorted catalog for a party level.
+            Items above the party level are never drawn, \
+            and items below it are less likely to be drawn the further below they are.
+
+        Parameters
+        ----------
+        averageLevel : int
+            The average player level of the party receiving the hoard.
+
+        Returns
+        -------
+        NDArray[np.float64]
+            The cumulative weights, cached per level.
+        """
+        if averageLevel not in self._cumulativeWeights:
+            levelGap = averageLevel - self.catalog["level"]
+            weights = np.where(
+                levelGap >= 0,
+                self.rarityWeights[self.catalog["rarity"]]
+                * self.levelFalloff ** np.maximum(levelGap, 0),
+                0.0,
+            )
+            self._cumulativeWeights[averageLevel] = np.cumsum(weights)
+        return self._cumulativeWeights[averageLevel]
+
+    def buildHoards(
+        self,
+        budgets: ArrayLike,
+        averageLevel: int | ArrayLike,
+        tolerance: float = 0.05,
+        minShare: float = 0.25,
+        maxItems: int = 64,
+    ) -> tuple[NDArray, NDArray[np.float64]]:
+        """
+        Fills each budget with randomly drawn catalog items until it is within tolerance.
+            Every draw is taken from the items worth between minShare of the remaining budget \
+            and the remaining budget plus tolerance, falling back to every affordable item \
+            when that range is empty. All hoards draw their next item in the same step.
+
+        Parameters
+        ----------
+        budgets : ArrayLike
+            The value of each hoard in SP.
+        averageLevel : int | ArrayLike
+            The average player level of the party receiving each hoard.
+        tolerance : float
+            The fraction of each budget the items may fall short of or exceed it by.
+            Defaults to 0.05
+        minShare : float
+            The smallest fraction of the remaining budget an item is preferred to be worth.
+            Defaults to 0.25
+        maxItems : int
+            Sets the maximum number of items in a hoard.
+            Defaults to 64
+
+        Returns
+        -------
+        tuple[NDArray[hoardItemDtype], NDArray[np.float64]]
+            The drawn items ordered by hoard, and the value of each hoard not covered by items, \
+            which is negative if the items exceed the budget.
+        """
+        budgets, averageLevel = (
+            np.ravel(parameter)
+            for parameter in np.broadcast_arrays(
+                np.asarray(budgets, dtype=np.float64), averageLevel
+            )
+        )
+        remaining = budgets.copy()
+        slack = budgets * tolerance
+        hoardIndex = []
+        itemIndex = []
+        for level in np.unique(averageLevel):
+            cumulativeWeights = self.cumulativeWeights(int(level))
+            active = np.flatnonzero((averageLevel == level) & (remaining > slack))
+            for _ in range(maxItems):
+                if len(active) == 0:
+                    break
+                # Find the value range of items to draw from by binary search
+                upper = np.searchsorted(
+                    self.values, remaining[active] + slack[active], side="right"
+                )
+                lower = np.searchsorted(self.values, remaining[active] * minShare)
+                lowerWeight = np.where(lower > 0, cumulativeWeights[lower - 1], 0.0)
+                upperWeight = np.where(upper > 0, cumulativeWeights[upper - 1], 0.0)
+                # Fall back to every affordable item when the preferred range has no weight
+                lowerWeight = np.where(upperWeight > lowerWeight, lowerWeight, 0.0)
+                drawable = upperWeight > 0
+                active, lowerWeight, upperWeight = (
+                    active[drawable],
+                    lowerWeight[drawable],
+                    upperWeight[drawable],
+                )
+                # Draw one item per hoard by inverting the cumulative weights
+                target = lowerWeight + np.random.random(len(active)) * (
+                    upperWeight - lowerWeight
+                )
+                drawn = np.minimum(
+                    np.searchsorted(cumulativeWeights, target, side="right"),
+                    len(self.values) - 1,
+                )
+                hoardIndex.append(active)
+                itemIndex.append(drawn)
+                remaining[active] -= self.values[drawn]
+                active = active[remaining[active] > slack[active]]
+        hoardIndex = np.concatenate(hoardIndex) if hoardIndex else np.empty(0, np.int64)
+        itemIndex = np.concatenate(itemIndex) if itemIndex else np.empty(0, np.int64)
+        order = np.argsort(hoardIndex, kind="stable")
+        items = np.empty(len(order), dtype=hoardItemDtype)
+        items["hoard"] = hoardIndex[order]
+        items["item"] = itemIndex[order]
+        items["name"] = self.catalog["name"][itemIndex[order]]
+        items["value"] = self.values[itemIndex[order]]
+        return items, remaining
+
+
+def parseargs():
+    parser = ap.ArgumentParser(
+        description="Generates Itemized Treasure Hoards for a Dungeon"
+    )
+    parser.add_argument(
+        "catalog", help="Sets the item catalog TSV file to draw items from."
+    )
+    parser.add_argument(
+        "playerCount", type=int, help="Sets the number of players the dungeon is designed for."
+    )
+    parser.add_argument(
+        "averageLevel", type=int, help="Sets the average player level the dungeon is designed for."
+    )
+    parser.add_argument(
+        "dungeonSize", type=int, help="Sets the maximum number of rooms in the dungeon."
+    )
+    parser.add_argument(
+        "-d", "--difficulty", default=1.0, type=float,
+        help="If present, multiplies the treasure reward by the provided difficulty modifier.",
+    )
+    parser.add_argument(
+        "--tolerance", default=0.05, type=float,
+        help="Sets the fraction of each treasure's value the items may differ from it by.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parseargs()
+    treasure = generateTreasureBatch(
+        args.playerCount, args.averageLevel, args.dungeonSize, args.difficulty
+    )
+    budgets = np.where(
+        treasure["denomination"] == "CP", treasure["value"] / 100, treasure["value"]
+    )
+    items, remaining = ItemCatalog(loadCatalog(args.catalog)).buildHoards(
+        budgets, args.averageLevel, args.tolerance
+    )
+    itemsByHoard = np.split(items, np.searchsorted(items["hoard"], np.arange(1, len(budgets))))
+    for number, hoardItems, leftover in zip(treasure["treasure"], itemsByHoard, remaining):
+        print(f"## Treasure {number}")
+        for item in hoardItems:
+            print(f"{item['name']}\t{item['value']:.2f} SP")
+        if leftover >= 0.01:
+            print(f"Coins\t{leftover:.2f} SP")
+
+
+if __name__ == "__main__":
+    main()
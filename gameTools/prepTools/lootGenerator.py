@@ -1,35 +1,251 @@
 #!/usr/bin/env python3
 
 import argparse as ap
+import os
+import sys
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from coreModules.outputWriter import OutputWriter, outputFormats
+from coreModules.playerManager import PlayerManager
+
+lootTableFile = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','..','savedData','lootByLevel.tsv')
+# Parsed loot tables kept for the life of the process, keyed by TSV path
+_lootTableCache = {}
+
+# Structured array layout for batch generated treasure, one row per treasure
+treasureDtype = np.dtype(
+    [
+        ("dungeon", np.int64),
+        ("treasure", np.int32),
+        ("value", np.float64),
+        ("denomination", "U2"),
+    ]
+)
+
 def parseargs():
     parser = ap.ArgumentParser(description='Generates Level Appropriate Loot for a Dungeon')
-    parser.add_argument('playerCount',type=int,help="Sets the number of players the dungeon is designed for.")
-    parser.add_argument('averageLevel',type=int,help="Sets the average player level the dungeon is designed for.")
-    parser.add_argument('dungeonSize',type=int,help="Sets the maximum number of rooms in the dungeon.")
+    parser.add_argument('playerCount',type=int,nargs='?',help="Sets the number of players the dungeon is designed for. Omitted when --party is used.")
+    parser.add_argument('averageLevel',type=int,nargs='?',help="Sets the average player level the dungeon is designed for. Omitted when --party is used.")
+    parser.add_argument('dungeonSize',type=int,nargs='?',help="Sets the maximum number of rooms in the dungeon.")
+    parser.add_argument('-p', '--party',default=None,help='If present, reads the number of players and average level of the provided party from savedData/players.tsv.')
     parser.add_argument('-d', '--difficulty',default=1.0,type=float,help='If present, multiplies the treasure reward by the provided difficulty modifier.')
+    parser.add_argument('-t', '--table',default='standard',help='Sets the named loot table from savedData/lootByLevel.tsv to use.')
+    parser.add_argument('-n', '--dungeons',default=1,type=int,help='Sets the number of dungeons to generate loot for.')
+    parser.add_argument('-o', '--output',default=None,help='If present, writes the generated loot to the provided file instead of printing it.')
+    parser.add_argument('-f', '--format',default='text',choices=outputFormats,help='Sets the format of the generated loot.')
     args = parser.parse_args()
+    if args.party is not None:
+        # Only the dungeon size is given on the command line, so it lands in the first positional
+        if args.averageLevel is not None or args.playerCount is None:
+            parser.error('only dungeonSize may be given with --party')
+        args.dungeonSize = args.playerCount
+        try:
+            args.playerCount, args.averageLevel = PlayerManager().partyParameters(args.party)
+        except KeyError:
+            parser.error(f'party {args.party} was not found in savedData/players.tsv')
+    elif args.dungeonSize is None:
+        parser.error('the following arguments are required: playerCount, averageLevel, dungeonSize')
     return args
 
-def generateTreasure(playerCount,averageLevel,dungeonSize,difficulty):
-    lootByLevel = {1:200,2:200,3:300,4:300,5:400,6:400,7:400,8:400,9:400,10:400}
+def loadLootTable(table='standard',file=lootTableFile):
+    """
+    Loads a named loot by level table as an array indexed by level.
+        The TSV has a 'level' column followed by one column per named table. It is parsed once \
+        and compiled to a .npz file next to it, which is reused until the TSV is modified.
+        Tables may cover different levels: levels missing from the file or left blank in a table's column hold NaN.
+
+    Parameters
+    ----------
+    table : str
+        The name of the table column to load.
+        Defaults to 'standard'
+    file : str | os.PathLike
+        The loot table TSV file.
+        Defaults to savedData/lootByLevel.tsv
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The treasure value per player for each level, indexed by level.
+    """
+    file = os.path.abspath(file)
+    modified = os.path.getmtime(file)
+    tables = _lootTableCache.get(file)
+    if tables is None or tables['modified'] != modified:
+        compiledFile = os.path.splitext(file)[0] + '.npz'
+        tables = None
+        if os.path.isfile(compiledFile):
+            with np.load(compiledFile) as compiled:
+                if compiled['modified'] == modified:
+                    tables = {'modified':modified,'names':compiled['names'].tolist(),'values':compiled['values']}
+        if tables is None:
+            with open(file) as tableFile:
+                names = tableFile.readline().rstrip('\n').split('\t')[1:]
+                # Blank cells are filled with NaN so each table can cover its own range of levels
+                rows = np.genfromtxt(tableFile,delimiter='\t',filling_values=np.nan,ndmin=2)
+            levels = rows[:,0].astype(np.int64)
+            values = np.full((len(names),levels.max(initial=0) + 1),np.nan)
+            values[:,levels] = rows[:,1:].T
+            np.savez(compiledFile,modified=modified,names=names,values=values)
+            tables = {'modified':modified,'names':names,'values':values}
+        _lootTableCache[file] = tables
+    if table not in tables['names']:
+        raise ValueError(f"Loot table '{table}' was not found in {file}.")
+    return tables['values'][tables['names'].index(table)]
+
+def lootForLevel(averageLevel,table='standard'):
+    """
+    Looks up the treasure value per player for one or many levels.
+
+    Parameters
+    ----------
+    averageLevel : int | ArrayLike
+        The levels to look up.
+    table : str
+        The name of the loot table to use.
+        Defaults to 'standard'
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The treasure value per player for each level.
+    """
+    lootByLevel = loadLootTable(table)
+    averageLevel = np.asarray(averageLevel)
+    known = (averageLevel >= 0) & (averageLevel < len(lootByLevel))
+    values = lootByLevel[np.where(known,averageLevel,0)]
+    if not np.all(known) or np.any(np.isnan(values)):
+        missing = np.unique(averageLevel[~known | np.isnan(values)])
+        raise ValueError(f"Levels {missing.tolist()} are not covered by loot table '{table}'.")
+    return values
+
+def generateTreasure(playerCount,averageLevel,dungeonSize,difficulty,table='standard',writer=None,dungeon=0):
+    """
+    Generates and writes the treasure of one dungeon as 'loot' and 'treasure' records.
+
+    Parameters
+    ----------
+    playerCount : int
+        The number of players the dungeon is designed for.
+    averageLevel : int
+        The average player level the dungeon is designed for.
+    dungeonSize : int
+        The maximum number of rooms in the dungeon.
+    difficulty : float
+        The treasure reward multiplier.
+    table : str
+        The name of the loot table to use.
+        Defaults to 'standard'
+    writer : OutputWriter | None
+        The writer to write the records to.
+        Defaults to a text writer on stdout.
+    dungeon : int
+        The number identifying the dungeon in every record, as in generateTreasureBatch.
+        Defaults to 0
+
+    Returns
+    -------
+    None if the treasure was successfully generated.
+    """
+    output = OutputWriter() if writer is None else writer
+    lootByLevel = lootForLevel(averageLevel,table)
     if difficulty == 1:
-        print(f"## Generating Loot for {playerCount} players of average level: {averageLevel}.")
+        text = f"## Generating Loot for {playerCount} players of average level: {averageLevel}."
     else:
-        print(f"## Generating Loot for {playerCount} players of average level: {averageLevel} with a difficulty modifier of {difficulty}.")
-    totalTreasure = float(lootByLevel[averageLevel] * playerCount * difficulty * (1 + 0.1 * (np.random.random() - 0.5)))
-    print(f"## Treasure Number\tTreasure Value")
+        text = f"## Generating Loot for {playerCount} players of average level: {averageLevel} with a difficulty modifier of {difficulty}."
+    output.write('loot',text,dungeon=dungeon,playerCount=playerCount,averageLevel=averageLevel,difficulty=difficulty,table=table)
+    totalTreasure = float(lootByLevel * playerCount * difficulty * (1 + 0.1 * (np.random.random() - 0.5)))
+    output.text(f"## Treasure Number\tTreasure Value")
     for room in range(dungeonSize):
         roomTreasure = float(format(totalTreasure * (0.5 ** (room + 1)),'.2f'))
+        # Every later room holds less, so stop once the treasure rounds to nothing
+        if roomTreasure <= 0:
+            break
         if roomTreasure > 0 and roomTreasure > 1:
-            print(f"## Treasure {room + 1}\t{roomTreasure} SP")
+            output.write('treasure',f"## Treasure {room + 1}\t{roomTreasure} SP",dungeon=dungeon,treasure=room + 1,value=roomTreasure,denomination='SP')
         if roomTreasure > 0 and roomTreasure < 1:
-            print(f"## Treasure {room + 1}\t{float(format(roomTreasure * 100,'.2f'))} CP")
+            copper = float(format(roomTreasure * 100,'.2f'))
+            output.write('treasure',f"## Treasure {room + 1}\t{copper} CP",dungeon=dungeon,treasure=room + 1,value=copper,denomination='CP')
+    if writer is None:
+        output.flush()
+
+def generateTreasureBatch(playerCount,averageLevel,dungeonSize,difficulty=1.0,table='standard'):
+    """
+    Generates treasure for many dungeons at once.
+
+    Parameters
+    ----------
+    playerCount : int | ArrayLike
+        The number of players each dungeon is designed for.
+    averageLevel : int | ArrayLike
+        The average player level each dungeon is designed for, as covered by the loot table.
+    dungeonSize : int | ArrayLike
+        The maximum number of rooms in each dungeon.
+    difficulty : float | ArrayLike
+        The treasure reward multiplier for each dungeon.
+        Defaults to 1.0
+    table : str
+        The name of the loot table to use.
+        Defaults to 'standard'
+
+    All parameters are broadcast against each other, one dungeon per resulting element.
+
+    Returns
+    -------
+    NDArray[treasureDtype]
+        A structured array of (dungeon, treasure, value, denomination) rows, ordered by dungeon \
+        and treasure number, containing only treasures worth at least 0.01 SP.
+    """
+    playerCount, averageLevel, dungeonSize, difficulty = (
+        np.ravel(parameter) for parameter in np.broadcast_arrays(playerCount,averageLevel,dungeonSize,difficulty)
+    )
+    totalTreasure = lootForLevel(averageLevel,table) * playerCount * difficulty * (1 + 0.1 * (np.random.random(len(playerCount)) - 0.5))
+    # Treasure halves in each room, so only the first log2(total / 0.005) rooms can hold any
+    maxTotal = max(float(totalTreasure.max(initial=0)), 0.005)
+    roomCount = int(min(dungeonSize.max(initial=0), np.ceil(np.log2(maxTotal / 0.005))))
+    rooms = np.arange(roomCount)
+    roomTreasure = np.round(totalTreasure[:, None] * 0.5 ** (rooms + 1), 2)
+    dungeonIndex, roomIndex = np.nonzero((roomTreasure > 0) & (rooms < dungeonSize[:, None]))
+    values = roomTreasure[dungeonIndex, roomIndex]
+    treasure = np.empty(len(values), dtype=treasureDtype)
+    treasure["dungeon"] = dungeonIndex
+    treasure["treasure"] = roomIndex + 1
+    # Treasures worth less than one SP are given in CP
+    isCopper = values < 1
+    treasure["value"] = np.where(isCopper, np.round(values * 100, 2), values)
+    treasure["denomination"] = np.where(isCopper, "CP", "SP")
+    return treasure
+
+def exportTreasure(treasure,writer):
+    """
+    Writes treasure produced by generateTreasureBatch as 'treasure' records in a single pass.
+
+    Parameters
+    ----------
+    treasure : NDArray[treasureDtype]
+        The treasure to export.
+    writer : OutputWriter
+        The writer to write the records to. Nothing is written in 'text' format.
+
+    Returns
+    -------
+    None if the treasure was successfully exported.
+    """
+    writer.writeColumns('treasure',**{name: treasure[name] for name in treasureDtype.names})
 
 def main():
     args = parseargs()
-    generateTreasure(args.playerCount,args.averageLevel,args.dungeonSize,args.difficulty)
+    # A TSV table holds one kind of record, so only the treasure rows are written
+    kinds = ('treasure',) if args.format == 'tsv' else None
+    with OutputWriter(output=args.output,fileFormat=args.format,kinds=kinds) as writer:
+        if args.output is None or args.format == 'text':
+            for dungeon in range(args.dungeons):
+                generateTreasure(args.playerCount,args.averageLevel,args.dungeonSize,args.difficulty,args.table,writer,dungeon)
+        else:
+            # Files only hold the treasure records, so every dungeon is generated in one pass
+            treasure = generateTreasureBatch(np.full(args.dungeons,args.playerCount),args.averageLevel,args.dungeonSize,args.difficulty,args.table)
+            exportTreasure(treasure,writer)
     
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
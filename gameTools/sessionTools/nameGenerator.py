@@ -2,11 +2,17 @@
 This module provides the generateNames function to generate names from a provided list of syllables.
 """
 
+import argparse as ap
+import os
+import sys
 from typing import Iterable
 
 import numpy as np
 from numpy.typing import NDArray
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from coreModules.outputWriter import OutputWriter, outputFormats
+
 
 def generateNames(
     syllables: Iterable[str],
@@ -153,4 +159,16 @@ if __name__ == "__main__":
         "zar",
         "zor",
     ]
-    print(*generateNames(testSyllables, 1000, 2, 3))
+    parser = ap.ArgumentParser(description="Generates Names from Test Syllables")
+    parser.add_argument(
+        "-f",
+        "--format",
+        default="text",
+        choices=outputFormats,
+        help="Sets the format the generated names are written in.",
+    )
+    args = parser.parse_args()
+    names = generateNames(testSyllables, 1000, 2, 3)
+    with OutputWriter(fileFormat=args.format) as writer:
+        writer.text(" ".join(names))
+        writer.writeColumns("name", name=names)
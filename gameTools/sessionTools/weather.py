@@ -2,16 +2,462 @@
 This module provides access to the WeatherData class to generate random weather patterns for the Book of Trials TTRPG ruleset.
 """
 
+import json
 import os
-from typing import Literal, Tuple
+import sys
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Dict, Literal, Sequence, Tuple
 
 import numpy as np
-from numpy.typing import DTypeLike
+from numpy.typing import ArrayLike, DTypeLike, NDArray
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from coreModules.dice import RandomBuffer, compileDice
+from coreModules.outputWriter import OutputWriter
 
 type _FileModesType = Literal["r", "r+", "w+"]
 type _DisplayModesType = Literal["all", "description", "gameEffect"]
 type _PathLikeType = str | bytes | os.PathLike
 
+# Shared 2d6 sampler used by every weather update roll
+_twoDSix = compileDice("2d6")
+
+# Weather update rules
+# A 2d6 roll moves wind, precipitation, fog, and cloud cover, weighted towards returning to none
+# Indexed by roll: 2: -2, 3-6: -1, 7-10: 0, 11: +1, 12: +2
+_driftByRoll = np.array([0, 0, -2, -1, -1, -1, -1, 0, 0, 0, 0, 1, 2])
+# A 2d6 roll moves the new temperature, indexed by roll: 2: -20 through 12: +20
+_temperatureByRoll = np.array([0, 0, -20, -15, -10, -5, 0, 0, 0, 5, 10, 15, 20])
+# Each rule is (weather array index, change by value, chance by value): the value at the index \
+# selects a change that is applied when that rule's random float is at or below its chance
+_windRules = (
+    # Altitude: [None, Low, Moderate, High, Extreme]
+    (0, np.array([0, 1, 1, 1, 1]), np.array([0.0, 0.05, 0.10, 0.15, 0.20])),
+    # Climate: [Cold, Cool, Temperate, Warm, Hot]
+    (1, np.array([1, 1, 0, -1, -1]), np.array([0.20, 0.15, 0.0, 0.15, 0.20])),
+    # Season: [Spring, Summer, Autumn, Winter]
+    (2, np.array([0, -1, 1, 1]), np.array([0.0, 0.25, 0.20, 0.15])),
+)
+_precipitationRules = (
+    (0, np.array([0, 1, 1, 1, 1]), np.array([0.0, 0.05, 0.10, 0.15, 0.20])),
+    (1, np.array([-1, -1, 0, 1, 1]), np.array([0.05, 0.05, 0.0, 0.05, 0.05])),
+    (2, np.array([1, -1, 0, 1]), np.array([0.05, 0.25, 0.0, 0.10])),
+)
+_fogRules = (
+    (0, np.array([0, -1, -1, -1, -2]), np.array([0.0, 0.25, 0.50, 1.0, 1.0])),
+    (1, np.array([1, 1, 0, -1, -1]), np.array([0.05, 0.05, 0.0, 0.05, 0.05])),
+    (2, np.array([1, -1, 1, 1]), np.array([0.05, 0.25, 0.15, 0.10])),
+    # Wind: [None, Low, Moderate, High]
+    (3, np.array([0, -1, -1, -2]), np.array([0.0, 0.25, 0.50, 1.0])),
+)
+_cloudRules = (
+    (0, np.array([0, 1, 1, 1, 2]), np.array([0.0, 0.25, 0.50, 0.75, 1.0])),
+    (1, np.array([1, 1, 0, -1, -1]), np.array([0.25, 0.10, 0.0, 0.25, 0.50])),
+    (2, np.array([1, -1, 1, 1]), np.array([0.25, 1.0, 0.25, 0.50])),
+    # Precipitation: [None, Low, Moderate, Heavy]
+    (5, np.array([0, 1, 1, 2]), np.array([0.0, 0.25, 0.50, 0.75])),
+)
+# Temperature targets by climate, altitude, season, and wind before the 2d6 roll
+_baseTemperature = np.array([35, 45, 55, 65, 75])
+_altitudeTemperature = np.array([0, -5, -10, -20, -30])
+_seasonTemperature = np.array([10, 20, -5, -10])
+_windChill = np.array([0, -5, -10, -15])
+# Daily storm chances used when displaying weather
+# Dust storms need High Winds and no precipitation, thunderstorms need Heavy precipitation
+_dustStormChance = np.array([0.0, 0.0, 0.0, 0.05, 0.05])
+_thunderstormChance = np.array([0.12, 0.20, 0.07, 0.01])
+# Every temperature an int8 weather array can hold
+temperatureStates = np.arange(-128, 128)
+# Precipitation types by the codes returned with hourly weather and resolved conditions, \
+# where 0 is no precipitation
+precipitationTypes = (None, "Freezing Rain", "Snow", "Sleet", "Hail", "Rain")
+# Resolved conditions are packed into one int8 stored after the weather values: \
+# bits 0-2 hold the precipitation type, bit 3 a dust storm, bit 4 a thunderstorm, \
+# and bit 5 marks the conditions as resolved, so 0 means the day is not resolved yet
+_conditionsIndex = 8
+_dustStormBit = 8
+_thunderstormBit = 16
+_resolvedBit = 32
+# Hourly weather updates each value with a 1 in 24 chance, so values change about once a day
+_hourlyUpdateChance = 1 / 24
+# Hourly offset from the day's temperature, from the Low at 3 AM to the High at 3 PM
+_diurnalOffset = np.rint(-10 * np.cos(2 * np.pi * (np.arange(24) - 3) / 24)).astype(np.int64)
+
+
+def _ruleChanges(weather, rules, changeChances):
+    """
+    Sums the changes of every rule whose random float is at or below its chance.
+    weather is a weather array as a list, so each rule is a few python operations.
+    """
+    total = 0
+    for (index, changes, chances), changeChance in zip(rules, changeChances):
+        value = weather[index]
+        if changeChance <= chances[value]:
+            total += int(changes[value])
+    return total
+
+
+def _batchRuleChanges(weather, rules, changeChances):
+    """
+    Sums the changes of every rule whose random float is at or below its chance for many weather arrays.
+    weather is a (regions, 8) array and changeChances is a (regions, rules) array of random floats.
+    """
+    total = np.zeros(len(weather), dtype=np.int64)
+    for column, (index, changes, chances) in enumerate(rules):
+        value = weather[:, index]
+        total += np.where(changeChances[:, column] <= chances[value], changes[value], 0)
+    return total
+
+
+def _batchStep(weather, rolls, changeChances, updates):
+    """
+    Applies the randomizeWeather updates, in the same order, to the rows of a (regions, 8) array in place.
+    rolls holds the 2d6 rolls of wind, temperature, precipitation, fog, and cloud cover, \
+    changeChances the 14 rule floats in the same order, and updates which of the five values change.
+    """
+    drift = _driftByRoll[rolls]
+    wind = weather[:, 3] + drift[:, 0] + _batchRuleChanges(weather, _windRules, changeChances[:, 0:3])
+    weather[:, 3] = np.where(updates[:, 0], np.clip(wind, 0, 3), weather[:, 3])
+    target = _targetTemperature(weather.T) + _temperatureByRoll[rolls[:, 1]]
+    # Averages are truncated towards zero, matching int() in updateTemperature
+    temperature = np.trunc((target + weather[:, 4]) * 0.5).astype(np.int64)
+    weather[:, 4] = np.where(updates[:, 1], temperature, weather[:, 4])
+    for column, rules, start, stop, update in (
+        (5, _precipitationRules, 3, 6, 2),
+        (6, _fogRules, 6, 10, 3),
+        (7, _cloudRules, 10, 14, 4),
+    ):
+        value = weather[:, column] + drift[:, update] + _batchRuleChanges(
+            weather, rules, changeChances[:, start:stop]
+        )
+        weather[:, column] = np.where(updates[:, update], np.clip(value, 0, 3), weather[:, column])
+
+
+def _resolveConditions(weather, chances):
+    """
+    Resolves dust storms, thunderstorms, and precipitation type for any number of weather arrays at once, \
+    following the rules of displayWeather.
+    weather is a (..., 8) array and chances a (..., 3) array of random floats.
+    """
+    climate, season, wind, temperature, precipitation = (
+        weather[..., index] for index in (1, 2, 3, 4, 5)
+    )
+    dustStorm = (precipitation == 0) & (wind == 3) & (chances[..., 0] <= _dustStormChance[climate])
+    thunderstorm = (precipitation == 3) & (chances[..., 0] <= _thunderstormChance[season])
+    precipitationType = np.select(
+        [
+            precipitation == 0,
+            (temperature <= 32) & (chances[..., 1] <= 0.25),
+            temperature <= 32,
+            temperature <= 38,
+            chances[..., 2] <= 0.10,
+        ],
+        [0, 1, 2, 3, 4],
+        5,
+    ).astype(np.int8)
+    return dustStorm, thunderstorm, precipitationType
+
+
+def resolveConditions(
+    arrWeather: ArrayLike, seed: int | np.random.Generator | None = None
+) -> NDArray[np.int8]:
+    """
+    Resolves the dust storm, thunderstorm, and precipitation type of any number of region-days at once.
+        A dust storm may occur in Warm and Hot climates with High Winds and no precipitation, \
+        and a thunderstorm with Heavy precipitation by a chance depending on the season. \
+        Precipitation is Freezing Rain or Snow at 32 or below, Sleet from 33 to 38, and Hail or Rain above.
+
+    Parameters
+    ----------
+    arrWeather : ArrayLike
+        A weather array, or an array of weather arrays with any leading shape.
+    seed : int | numpy.random.Generator | None
+        If present, seeds the chance rolls, or the generator to draw from.
+
+    Returns
+    -------
+    NDArray[np.int8]
+        The packed conditions of each weather array, as stored in a weather array's conditions value \
+        and read by decodeConditions.
+    """
+    weather = np.asarray(arrWeather, dtype=np.int64)
+    chances = np.random.default_rng(seed).random(weather.shape[:-1] + (3,))
+    dustStorm, thunderstorm, precipitationType = _resolveConditions(weather, chances)
+    return (
+        _resolvedBit
+        | dustStorm * _dustStormBit
+        | thunderstorm * _thunderstormBit
+        | precipitationType
+    ).astype(np.int8)
+
+
+def decodeConditions(
+    conditions: ArrayLike,
+) -> Tuple[NDArray[np.bool_], NDArray[np.bool_], NDArray[np.int8]]:
+    """
+    Unpacks conditions produced by resolveConditions.
+
+    Parameters
+    ----------
+    conditions : ArrayLike
+        The packed conditions.
+
+    Returns
+    -------
+    Tuple[NDArray[np.bool_], NDArray[np.bool_], NDArray[np.int8]]
+        Whether a dust storm and a thunderstorm occur, \
+        and the precipitation type code indexing precipitationTypes.
+    """
+    conditions = np.asarray(conditions, dtype=np.int8)
+    return (
+        (conditions & _dustStormBit) != 0,
+        (conditions & _thunderstormBit) != 0,
+        (conditions & 7).astype(np.int8),
+    )
+
+
+def simulateHourly(
+    arrWeather: ArrayLike,
+    days: int = 1,
+    seed: int | np.random.Generator | None = None,
+) -> Tuple[NDArray[np.int8], Dict[str, NDArray]]:
+    """
+    Simulates hour by hour weather for one or many regions in a single vectorized pass.
+        Each hour, every weather value independently takes its daily update with a 1 in 24 chance, \
+        so values change about once per day as with randomizeWeather, but at any hour. \
+        The returned temperature adds the hour's offset between the day's Low at 3 AM and High at 3 PM. \
+        Storm and precipitation type chances are rolled once per region per day \
+        and applied to each hour's conditions, so a storm lasts while its conditions hold.
+
+    Parameters
+    ----------
+    arrWeather : ArrayLike
+        A weather array, or a (regions, 8) array of weather arrays, to start from.
+    days : int
+        The number of days to simulate.
+        Defaults to 1
+    seed : int | numpy.random.Generator | None
+        If present, seeds the simulation, or the generator to draw from.
+
+    Returns
+    -------
+    Tuple[NDArray[np.int8], Dict[str, NDArray]]
+        A (days * 24, 8) array of hourly weather, or (regions, days * 24, 8) for many regions, \
+        and the hourly 'dustStorm' and 'thunderstorm' flags and 'precipitationType' codes \
+        indexing precipitationTypes, each shaped like the hourly weather without its last axis.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.asarray(arrWeather, dtype=np.int64)[..., :8]
+    weather = start.reshape(-1, 8).copy()
+    regions = len(weather)
+    hourly = np.empty((regions, days * 24, 8), dtype=np.int64)
+    for day in range(days):
+        # Draw the random values of a whole day at once
+        rolls = _twoDSix.sample((24, regions, 5), rng)
+        changeChances = rng.random((24, regions, 14))
+        updates = rng.random((24, regions, 5)) < _hourlyUpdateChance
+        for hour in range(24):
+            _batchStep(weather, rolls[hour], changeChances[hour], updates[hour])
+            hourly[:, day * 24 + hour] = weather
+    hourly[:, :, 4] += np.tile(_diurnalOffset, days)
+    np.clip(hourly[:, :, 4], -128, 127, out=hourly[:, :, 4])
+    chances = np.repeat(rng.random((regions, days, 3)), 24, axis=1)
+    dustStorm, thunderstorm, precipitationType = _resolveConditions(hourly, chances)
+    shape = hourly.shape[1:] if start.ndim == 1 else hourly.shape
+    conditions = {
+        "dustStorm": dustStorm.reshape(shape[:-1]),
+        "thunderstorm": thunderstorm.reshape(shape[:-1]),
+        "precipitationType": precipitationType.reshape(shape[:-1]),
+    }
+    return hourly.astype(np.int8).reshape(shape), conditions
+
+
+def _ruleTransition(rules, conditions):
+    """
+    Builds the 4x4 transition matrix of a weather value under fixed conditions, \
+    from the 2d6 drift and the chance of each rule applying.
+    conditions maps each weather array index used by the rules to its value.
+    """
+    # Distribution of the total change, starting from the 2d6 drift
+    changes: Dict[int, float] = {}
+    for roll, probability in zip(*_twoDSix.distribution()):
+        drift = int(_driftByRoll[roll])
+        changes[drift] = changes.get(drift, 0.0) + probability
+    for index, ruleChanges, ruleChances in rules:
+        change = int(ruleChanges[conditions[index]])
+        chance = float(ruleChances[conditions[index]])
+        applied: Dict[int, float] = {}
+        for total, probability in changes.items():
+            applied[total] = applied.get(total, 0.0) + probability * (1 - chance)
+            applied[total + change] = applied.get(total + change, 0.0) + probability * chance
+        changes = applied
+    transition = np.zeros((4, 4))
+    for value in range(4):
+        for total, probability in changes.items():
+            transition[value, min(3, max(0, value + total))] += probability
+    return transition
+
+
+@lru_cache(maxsize=128)
+def _transitionMatrices(altitude: int, climate: int, season: int):
+    """
+    Builds the daily Markov transition matrices of the weather under fixed altitude, climate, and season.
+    Precipitation and cloud cover never depend on wind, fog, or temperature, so the weather splits into \
+    three chains: (wind, fog) with 16 states, (precipitation, cloud cover) with 16 states, \
+    and temperature, which is returned as one 256x256 matrix per new wind value.
+    """
+    conditions = {0: altitude, 1: climate, 2: season}
+    wind = _ruleTransition(_windRules, conditions)
+    precipitation = _ruleTransition(_precipitationRules, conditions)
+    fogByWind = np.array(
+        [_ruleTransition(_fogRules, {**conditions, 3: value}) for value in range(4)]
+    )
+    cloudsByPrecipitation = np.array(
+        [_ruleTransition(_cloudRules, {**conditions, 5: value}) for value in range(4)]
+    )
+    # Fog and cloud cover update after the new wind and precipitation values are set
+    windFog = np.einsum("ac,cbd->abcd", wind, fogByWind).reshape(16, 16)
+    precipitationClouds = np.einsum(
+        "ac,cbd->abcd", precipitation, cloudsByPrecipitation
+    ).reshape(16, 16)
+    temperatureByWind = np.zeros((4, len(temperatureStates), len(temperatureStates)))
+    for windValue in range(4):
+        target = _targetTemperature([altitude, climate, season, windValue])
+        for roll, probability in zip(*_twoDSix.distribution()):
+            # Averages are truncated towards zero, matching int() in updateTemperature
+            newTemperature = np.trunc(
+                (target + _temperatureByRoll[roll] + temperatureStates) * 0.5
+            ).astype(np.int64)
+            temperatureByWind[
+                windValue, np.arange(len(temperatureStates)), newTemperature + 128
+            ] += probability
+    return wind, windFog, precipitationClouds, temperatureByWind
+
+
+@lru_cache(maxsize=1024)
+def _transitionPower(altitude: int, climate: int, season: int, chain: int, exponent: int):
+    """
+    Raises the (wind, fog) chain (chain 1) or the (precipitation, cloud cover) chain (chain 2) \
+    to a power of two by repeated squaring, caching every power on the way.
+    """
+    if exponent == 1:
+        return _transitionMatrices(altitude, climate, season)[chain]
+    half = _transitionPower(altitude, climate, season, chain, exponent // 2)
+    return half @ half
+
+
+def _advanceChain(distribution, altitude, climate, season, chain, days):
+    """
+    Advances a distribution over a 16 state chain by a number of days using cached powers of two.
+    """
+    exponent = 1
+    while days:
+        if days & 1:
+            distribution = distribution @ _transitionPower(
+                altitude, climate, season, chain, exponent
+            )
+        days >>= 1
+        exponent <<= 1
+    return distribution
+
+
+def _advanceTemperature(distribution, altitude, climate, season, days):
+    """
+    Advances a (wind, temperature) distribution by a number of days.
+    Each day moves wind, then temperature under the new wind, \
+    which is four 256x256 products rather than one 1024x1024 product.
+    """
+    wind, _, _, temperatureByWind = _transitionMatrices(altitude, climate, season)
+    for _ in range(days):
+        distribution = np.einsum(
+            "ab,ac,cbd->cd", distribution, wind, temperatureByWind
+        )
+    return distribution
+
+
+def _stationary(transition):
+    """
+    Solves for the distribution a transition matrix leaves unchanged.
+    """
+    states = len(transition)
+    system = np.vstack([transition.T - np.eye(states), np.ones(states)])
+    target = np.zeros(states + 1)
+    target[-1] = 1
+    distribution = np.linalg.lstsq(system, target, rcond=None)[0]
+    distribution = np.clip(distribution, 0, None)
+    return distribution / distribution.sum()
+
+
+@lru_cache(maxsize=128)
+def _stationaryDistributions(altitude: int, climate: int, season: int):
+    """
+    Calculates the long run distributions of the three weather chains.
+    """
+    wind, windFog, precipitationClouds, temperatureByWind = _transitionMatrices(
+        altitude, climate, season
+    )
+    windTemperature = np.einsum("ac,cbd->abcd", wind, temperatureByWind).reshape(
+        4 * len(temperatureStates), 4 * len(temperatureStates)
+    )
+    return (
+        _stationary(windFog),
+        _stationary(precipitationClouds),
+        _stationary(windTemperature).reshape(4, len(temperatureStates)),
+    )
+
+
+def _summarizeForecast(windFog, precipitationClouds, windTemperature, climate, season):
+    """
+    Combines the distributions of the three weather chains into the probability of each weather value, \
+    temperature band, precipitation type, and storm.
+    """
+    windFog = windFog.reshape(4, 4)
+    precipitationClouds = precipitationClouds.reshape(4, 4)
+    wind = windFog.sum(axis=1)
+    precipitation = precipitationClouds.sum(axis=1)
+    temperature = windTemperature.sum(axis=0)
+    extremeCold = float(temperature[temperatureStates <= 32].sum())
+    sleet = float(temperature[(temperatureStates >= 33) & (temperatureStates <= 38)].sum())
+    warm = float(temperature[temperatureStates >= 39].sum())
+    anyPrecipitation = float(1 - precipitation[0])
+    # The chains share no values, so their probabilities multiply
+    return {
+        "wind": wind,
+        "fog": windFog.sum(axis=0),
+        "precipitation": precipitation,
+        "cloudCover": precipitationClouds.sum(axis=0),
+        "temperature": temperature,
+        "temperatureBand": {
+            "Extreme Cold": extremeCold,
+            "Cold": sleet,
+            "Mild": float(temperature[(temperatureStates >= 39) & (temperatureStates <= 89)].sum()),
+            "Extreme Heat": float(temperature[temperatureStates >= 90].sum()),
+        },
+        "precipitationType": {
+            "Freezing Rain": anyPrecipitation * extremeCold * 0.25,
+            "Snow": anyPrecipitation * extremeCold * 0.75,
+            "Sleet": anyPrecipitation * sleet,
+            "Hail": anyPrecipitation * warm * 0.10,
+            "Rain": anyPrecipitation * warm * 0.90,
+        },
+        "dustStorm": float(precipitation[0] * wind[3] * _dustStormChance[climate]),
+        "thunderstorm": float(precipitation[3] * _thunderstormChance[season]),
+    }
+
+
+def _targetTemperature(weather):
+    """
+    Calculates the temperature the weather moves towards before the 2d6 roll.
+    weather is a single weather array or list.
+    """
+    return (
+        _baseTemperature[weather[1]]
+        + _altitudeTemperature[weather[0]]
+        + _seasonTemperature[weather[2]]
+        + _windChill[weather[3]]
+    )
+
 
 class WeatherData:
     """
@@ -25,17 +471,81 @@ class WeatherData:
         Possible precipitation values: [0-3]: 'None', 'Low', 'Moderate', 'Heavy'
         Possible fog values: [0-3]: 'None', 'Low', 'Moderate', 'Heavy'
         Possible cloud cover values: [0-3]: 'None', 'Low', 'Moderate', 'Heavy'
+        The ninth value holds the day's storms and precipitation type once resolved, see resolveConditions. \
+        Existing eight value files gain it when opened for writing and are left as is when opened read only.
+    Random values are drawn from a RandomBuffer, so passing a seed makes the generated weather reproducible.
     """
 
-    def __init__(self, file: _PathLikeType, mode: _FileModesType = "r"):
+    def __init__(
+        self, file: _PathLikeType, mode: _FileModesType = "r", seed: int | None = None
+    ):
         # Initialize Properties for memmap
         self.file = file
         self.mode = mode
+        self.seed = seed
+        # Pre-drawn random values shared by every update and display of this region
+        self.random = RandomBuffer(seed)
+        # Conditions resolved for read only handles that can not store them
+        self._conditions = None
         # Map weather data array to a binary file on disk
-        self.memmap(mode=mode, file=file, shape=8, dtype=np.int8)
+        legacy = mode == "r" and os.path.isfile(file) and os.path.getsize(file) == 8
+        self.memmap(mode=mode, file=file, shape=8 if legacy else 9, dtype=np.int8)
+
+    @classmethod
+    def fromArray(cls, arrWeather: ArrayLike, seed: int | Sequence[int] | None = None) -> "WeatherData":
+        """
+        Creates weather data held in memory instead of mapped to a file, such as for replaying past days.
+
+        Parameters
+        ----------
+        arrWeather : ArrayLike
+            The weather array to copy.
+        seed : int | Sequence[int] | None
+            If present, seeds the random values used to update the weather.
+
+        Returns
+        -------
+        WeatherData
+            Writable weather data whose changes are never flushed.
+        """
+        weather = cls.__new__(cls)
+        weather.file = None
+        weather.mode = "w+"
+        weather.seed = seed
+        weather.random = RandomBuffer(seed)
+        weather._conditions = None
+        weather.arrWeather = np.array(arrWeather, dtype=np.int8)
+        return weather
+
+    @property
+    def arrWeather(self) -> NDArray[np.int8]:
+        if self._arrWeather is None:
+            raise ValueError(
+                f"File: {self.file} was closed or evicted from its WeatherPool and thus cannot be used."
+            )
+        return self._arrWeather
+
+    @arrWeather.setter
+    def arrWeather(self, arrWeather: NDArray[np.int8] | None):
+        self._arrWeather = arrWeather
 
     def __str__(self):
-        return f"File: {self.file}\tMode: {self.mode}\tWeather Array: {self.arrWeather}"
+        return f"File: {self.file}\tMode: {self.mode}\tWeather Array: {self._arrWeather}"
+
+    def close(self):
+        """
+        Flushes changes to the memory mapped file and releases this handle's mapping.
+            The mapping is unmapped once no other views of the weather array remain, \
+            and the handle can not be used again afterwards, so its methods raise a ValueError. \
+            Closing a closed handle does nothing.
+
+        Returns
+        -------
+        None if the weather array was successfully closed.
+        """
+        if isinstance(self._arrWeather, np.memmap) and self.mode != "r":
+            self._arrWeather.flush()
+        self._arrWeather = None
 
     def __len__(self):
         return self.arrWeather.shape[0]
@@ -81,6 +591,63 @@ class WeatherData:
                 f"File: {file} was not found, and can not be created in {mode} mode."
             )
 
+    def _clearConditions(self):
+        # Any change to the weather replaces the day's resolved conditions
+        self._conditions = None
+        if len(self.arrWeather) > _conditionsIndex:
+            self.arrWeather[_conditionsIndex] = 0
+
+    def conditions(self, flush: bool = True) -> Tuple[bool, bool, str | None]:
+        """
+        Provides the day's storms and precipitation type, resolving them the first time they are needed.
+            Resolved conditions are stored in the weather array, so every later display \
+            and effect calculation of the same day uses the same result. \
+            Read only handles keep them for the life of the handle.
+            The rolls are drawn from a generator spawned from the random buffer, \
+            so displaying the weather does not change the weather of later days.
+
+        Parameters
+        ----------
+        flush : bool
+            If true, flushes newly resolved conditions to the memory mapped file.
+
+        Returns
+        -------
+        Tuple[bool, bool, str | None]
+            Whether a dust storm and a thunderstorm occur, and the precipitation type, or None without precipitation.
+        """
+        stored = (
+            int(self.arrWeather[_conditionsIndex])
+            if len(self.arrWeather) > _conditionsIndex
+            else 0
+        )
+        if stored & _resolvedBit:
+            conditions = stored
+        elif self._conditions is not None:
+            conditions = self._conditions
+        else:
+            weather = self.arrWeather.tolist()[:8]
+            dustStorm, thunderstorm, precipitationType = _resolveConditions(
+                np.array(weather), self.random.spawn().random(3)
+            )
+            conditions = (
+                _resolvedBit
+                | int(dustStorm) * _dustStormBit
+                | int(thunderstorm) * _thunderstormBit
+                | int(precipitationType)
+            )
+            if self.mode != "r" and len(self.arrWeather) > _conditionsIndex:
+                self.arrWeather[_conditionsIndex] = conditions
+                if flush is True and isinstance(self.arrWeather, np.memmap):
+                    self.arrWeather.flush()
+            else:
+                self._conditions = conditions
+        return (
+            bool(conditions & _dustStormBit),
+            bool(conditions & _thunderstormBit),
+            precipitationTypes[conditions & 7],
+        )
+
     def setWeather(
         self,
         altitude: int = None,
@@ -140,7 +707,8 @@ class WeatherData:
             raise ValueError(
                 f"File: {self.file} is opened in {self.mode} mode and thus cannot be updated."
             )
-        self.arrWeather[:] = [
+        self._clearConditions()
+        self.arrWeather[:8] = [
             altitude if altitude else self.arrWeather[0],
             climate if climate else self.arrWeather[1],
             season if season else self.arrWeather[2],
@@ -150,7 +718,7 @@ class WeatherData:
             fog if fog else self.arrWeather[6],
             cloudCover if cloudCover else self.arrWeather[7],
         ]
-        if flush is True:
+        if flush is True and isinstance(self.arrWeather, np.memmap):
             self.arrWeather.flush()
 
     def randomizeWeather(self, flush: bool = True):
@@ -175,7 +743,7 @@ class WeatherData:
         self.updatePrecipitation(flush=False)
         self.updateObscurement(flush=False)
         self.updateClouds(flush=False)
-        if flush is True:
+        if flush is True and isinstance(self.arrWeather, np.memmap):
             self.arrWeather.flush()
 
     def updateWind(self, flush: bool = True):
@@ -195,73 +763,21 @@ class WeatherData:
             raise ValueError(
                 f"File: {self.file} is opened in {self.mode} mode and thus cannot be updated."
             )
+        self._clearConditions()
         # Generate 2d6 for randomizing wind value, weighted towards returning to no wind
-        diceRoll = np.sum(np.random.randint(1, 7, 2))
-        randomization = (
-            -2
-            if diceRoll in [2]
-            else -1
-            if diceRoll in [3, 4, 5, 6]
-            else 0
-            if diceRoll in [7, 8, 9, 10]
-            else 1
-            if diceRoll in [11]
-            else 2
-        )
+        randomization = _driftByRoll[self.random.roll(_twoDSix)]
         # Generate floats to determine if wind value changes for altitude, climate, and season
-        windChangeChance = np.random.random(3)
-        # Alter wind value by altitude
-        altitudeChange = (
-            1
-            if any(
-                [
-                    self.arrWeather[0] == 4 and windChangeChance[0] <= 0.20,
-                    self.arrWeather[0] == 3 and windChangeChance[0] <= 0.15,
-                    self.arrWeather[0] == 2 and windChangeChance[0] <= 0.10,
-                    self.arrWeather[0] == 1 and windChangeChance[0] <= 0.05,
-                ]
-            )
-            else 0
-        )
-        # Alter wind value by climate
-        climateChange = (
-            -1
-            if self.arrWeather[1] == 4 and windChangeChance[1] <= 0.20
-            else -1
-            if self.arrWeather[1] == 3 and windChangeChance[1] <= 0.15
-            else 0
-            if self.arrWeather[1] == 2
-            else 1
-            if self.arrWeather[1] == 1 and windChangeChance[1] <= 0.15
-            else 1
-            if self.arrWeather[1] == 0 and windChangeChance[1] <= 0.20
-            else 0
-        )
-        # Alter wind value by season
-        seasonChange = (
-            0
-            if self.arrWeather[2] == 0
-            else -1
-            if self.arrWeather[2] == 1 and windChangeChance[2] <= 0.25
-            else 1
-            if self.arrWeather[2] == 2 and windChangeChance[2] <= 0.20
-            else 1
-            if self.arrWeather[2] == 3 and windChangeChance[2] <= 0.15
-            else 0
-        )
+        windChangeChance = self.random.random(3)
         # Bound minimum and maximum wind values
+        weather = self.arrWeather.tolist()
         self.arrWeather[3] = min(
             3,
             max(
                 0,
-                self.arrWeather[3]
-                + randomization
-                + altitudeChange
-                + climateChange
-                + seasonChange,
+                weather[3] + randomization + _ruleChanges(weather, _windRules, windChangeChance),
             ),
         )
-        if flush is True:
+        if flush is True and isinstance(self.arrWeather, np.memmap):
             self.arrWeather.flush()
 
     def updateTemperature(self, flush: bool = True):
@@ -281,82 +797,15 @@ class WeatherData:
             raise ValueError(
                 f"File: {self.file} is opened in {self.mode} mode and thus cannot be updated."
             )
-        # Set base temperature depending on climate
-        baseTemp = (
-            75
-            if self.arrWeather[1] == 4
-            else 65
-            if self.arrWeather[1] == 3
-            else 55
-            if self.arrWeather[1] == 2
-            else 45
-            if self.arrWeather[1] == 1
-            else 35
-            if self.arrWeather[1] == 0
-            else 55
-        )
-        # Apply a modifier based on the altitude
-        altitudeFactor = (
-            -30
-            if self.arrWeather[0] == 4
-            else -20
-            if self.arrWeather[0] == 3
-            else -10
-            if self.arrWeather[0] == 2
-            else -5
-            if self.arrWeather[0] == 1
-            else 0
-        )
+        self._clearConditions()
         # Generate 2d6 and randomize temperature based on it
-        diceRoll = np.sum(np.random.randint(1, 7, 2))
-        randomization = (
-            -20
-            if diceRoll == 2
-            else -15
-            if diceRoll == 3
-            else -10
-            if diceRoll == 4
-            else -5
-            if diceRoll == 5
-            else 0
-            if diceRoll in [6, 7, 8]
-            else 5
-            if diceRoll == 9
-            else 10
-            if diceRoll == 10
-            else 15
-            if diceRoll == 11
-            else 20
-        )
-        # Apply a modifier based on the season
-        seasonFactor = (
-            10
-            if self.arrWeather[2] == 0
-            else 20
-            if self.arrWeather[2] == 1
-            else -5
-            if self.arrWeather[2] == 2
-            else -10
-            if self.arrWeather[2] == 3
-            else 0
-        )
-        # Apply a modifier based on wind speed
-        windChill = (
-            -15
-            if self.arrWeather[3] == 3
-            else -10
-            if self.arrWeather[3] == 2
-            else -5
-            if self.arrWeather[3] == 1
-            else 0
-        )
-        # Calculate the new temperature based on current conditions
-        newTemperature = (
-            baseTemp + randomization + altitudeFactor + seasonFactor + windChill
-        )
-        # Average the new and previosu temperature to prevent wild fluctuations
-        self.arrWeather[4] = int((newTemperature + self.arrWeather[4]) * 0.5)
-        if flush is True:
+        randomization = _temperatureByRoll[self.random.roll(_twoDSix)]
+        # Calculate the new temperature based on climate, altitude, season, and wind speed
+        weather = self.arrWeather.tolist()
+        newTemperature = int(_targetTemperature(weather) + randomization)
+        # Average the new and previous temperature to prevent wild fluctuations
+        self.arrWeather[4] = int((newTemperature + weather[4]) * 0.5)
+        if flush is True and isinstance(self.arrWeather, np.memmap):
             self.arrWeather.flush()
 
     def updatePrecipitation(self, flush: bool = True):
@@ -376,75 +825,23 @@ class WeatherData:
             raise ValueError(
                 f"File: {self.file} is opened in {self.mode} mode and thus cannot be updated."
             )
+        self._clearConditions()
         # Generate 2d6 for randomizing precipitation value
         # Weighted towards returning to no precipitation
-        diceRoll = np.sum(np.random.randint(1, 7, 2))
-        randomization = (
-            -2
-            if diceRoll in [2]
-            else -1
-            if diceRoll in [3, 4, 5, 6]
-            else 0
-            if diceRoll in [7, 8, 9, 10]
-            else 1
-            if diceRoll in [11]
-            else 2
-        )
+        randomization = _driftByRoll[self.random.roll(_twoDSix)]
         # Generate floats to determine if precipitation changes
         # Based on altitude, climate, and season
-        precipChangeChance = np.random.random(3)
-        # Alter precipitation value by altitude
-        altitudeChange = (
-            1
-            if any(
-                [
-                    self.arrWeather[0] == 4 and precipChangeChance[0] <= 0.20,
-                    self.arrWeather[0] == 3 and precipChangeChance[0] <= 0.15,
-                    self.arrWeather[0] == 2 and precipChangeChance[0] <= 0.10,
-                    self.arrWeather[0] == 1 and precipChangeChance[0] <= 0.05,
-                ]
-            )
-            else 0
-        )
-        # Alter precipitation value by climate
-        climateChange = (
-            1
-            if self.arrWeather[1] == 4 and precipChangeChance[1] <= 0.05
-            else 1
-            if self.arrWeather[1] == 3 and precipChangeChance[1] <= 0.05
-            else 0
-            if self.arrWeather[1] == 2
-            else -1
-            if self.arrWeather[1] == 1 and precipChangeChance[1] <= 0.05
-            else -1
-            if self.arrWeather[1] == 0 and precipChangeChance[1] <= 0.05
-            else 0
-        )
-        # Alter precipitation value by season
-        seasonChange = (
-            1
-            if self.arrWeather[2] == 0 and precipChangeChance[2] <= 0.05
-            else -1
-            if self.arrWeather[2] == 1 and precipChangeChance[2] <= 0.25
-            else 0
-            if self.arrWeather[2] == 2 and precipChangeChance[2] <= 0.00
-            else 1
-            if self.arrWeather[2] == 3 and precipChangeChance[2] <= 0.10
-            else 0
-        )
+        precipChangeChance = self.random.random(3)
         # Bound minimum and maximum precipitation values
+        weather = self.arrWeather.tolist()
         self.arrWeather[5] = min(
             3,
             max(
                 0,
-                self.arrWeather[5]
-                + randomization
-                + altitudeChange
-                + climateChange
-                + seasonChange,
+                weather[5] + randomization + _ruleChanges(weather, _precipitationRules, precipChangeChance),
             ),
         )
-        if flush is True:
+        if flush is True and isinstance(self.arrWeather, np.memmap):
             self.arrWeather.flush()
 
     def updateObscurement(self, flush: bool = True):
@@ -464,85 +861,23 @@ class WeatherData:
             raise ValueError(
                 f"File: {self.file} is opened in {self.mode} mode and thus cannot be updated."
             )
+        self._clearConditions()
         # Generate 2d6 for randomizing fog value
         # Weighted towards returning to no fog
-        diceRoll = np.sum(np.random.randint(1, 7, 2))
-        randomization = (
-            -2
-            if diceRoll in [2]
-            else -1
-            if diceRoll in [3, 4, 5, 6]
-            else 0
-            if diceRoll in [7, 8, 9, 10]
-            else 1
-            if diceRoll in [11]
-            else 2
-        )
+        randomization = _driftByRoll[self.random.roll(_twoDSix)]
         # Generate floats to determine if fog changes
         # Based on altitude, climate, season, and wind
-        obscurementChangeChance = np.random.random(4)
-        # Alter fog value by altitude
-        altitudeChange = (
-            -2
-            if self.arrWeather[0] == 4
-            else -1
-            if self.arrWeather[0] == 3
-            else -1
-            if self.arrWeather[0] == 2 and obscurementChangeChance[0] <= 0.50
-            else -1
-            if self.arrWeather[0] == 1 and obscurementChangeChance[0] <= 0.25
-            else 0
-        )
-        # Alter fog value by climate
-        climateChange = (
-            -1
-            if self.arrWeather[1] == 4 and obscurementChangeChance[1] <= 0.05
-            else -1
-            if self.arrWeather[1] == 3 and obscurementChangeChance[1] <= 0.05
-            else 0
-            if self.arrWeather[1] == 2
-            else 1
-            if self.arrWeather[1] == 1 and obscurementChangeChance[1] <= 0.05
-            else 1
-            if self.arrWeather[1] == 0 and obscurementChangeChance[1] <= 0.05
-            else 0
-        )
-        # Alter fog value by season
-        seasonChange = (
-            1
-            if self.arrWeather[2] == 0 and obscurementChangeChance[2] <= 0.05
-            else -1
-            if self.arrWeather[2] == 1 and obscurementChangeChance[2] <= 0.25
-            else 1
-            if self.arrWeather[2] == 2 and obscurementChangeChance[2] <= 0.15
-            else 1
-            if self.arrWeather[2] == 3 and obscurementChangeChance[2] <= 0.10
-            else 0
-        )
-        # Alter fog value by wind
-        windChange = (
-            -2
-            if self.arrWeather[3] == 3
-            else -1
-            if self.arrWeather[3] == 2 and obscurementChangeChance[3] <= 0.50
-            else -1
-            if self.arrWeather[3] == 1 and obscurementChangeChance[3] <= 0.25
-            else 0
-        )
+        obscurementChangeChance = self.random.random(4)
         # Bound minimum and maximum fog values
+        weather = self.arrWeather.tolist()
         self.arrWeather[6] = min(
             3,
             max(
                 0,
-                self.arrWeather[6]
-                + randomization
-                + altitudeChange
-                + climateChange
-                + seasonChange
-                + windChange,
+                weather[6] + randomization + _ruleChanges(weather, _fogRules, obscurementChangeChance),
             ),
         )
-        if flush is True:
+        if flush is True and isinstance(self.arrWeather, np.memmap):
             self.arrWeather.flush()
 
     def updateClouds(self, flush: bool = True):
@@ -563,88 +898,103 @@ class WeatherData:
             raise ValueError(
                 f"File: {self.file} is opened in {self.mode} mode and thus cannot be updated."
             )
+        self._clearConditions()
         # Generate 2d6 for randomizing cloud cover value
         # Weighted towards returning to no clouds
-        diceRoll = np.sum(np.random.randint(1, 7, 2))
-        randomization = (
-            -2
-            if diceRoll in [2]
-            else -1
-            if diceRoll in [3, 4, 5, 6]
-            else 0
-            if diceRoll in [7, 8, 9, 10]
-            else 1
-            if diceRoll in [11]
-            else 2
-        )
+        randomization = _driftByRoll[self.random.roll(_twoDSix)]
         # Generate random floats to determine if clouds changes
         # Based on altitude, climate, season, and weather
-        cloudsChangeChance = np.random.random(4)
-        # Alter clouds value by altitude
-        altitudeChange = (
-            2
-            if self.arrWeather[0] == 4
-            else 1
-            if self.arrWeather[0] == 3 and cloudsChangeChance[0] <= 0.75
-            else 1
-            if self.arrWeather[0] == 2 and cloudsChangeChance[0] <= 0.50
-            else 1
-            if self.arrWeather[0] == 1 and cloudsChangeChance[0] <= 0.25
-            else 0
-        )
-        # Alter clouds value by climate
-        climateChange = (
-            -1
-            if self.arrWeather[1] == 4 and cloudsChangeChance[1] <= 0.50
-            else -1
-            if self.arrWeather[1] == 3 and cloudsChangeChance[1] <= 0.25
-            else 0
-            if self.arrWeather[1] == 2
-            else 1
-            if self.arrWeather[1] == 1 and cloudsChangeChance[1] <= 0.10
-            else 1
-            if self.arrWeather[1] == 0 and cloudsChangeChance[1] <= 0.25
-            else 0
-        )
-        # Alter clouds value by season
-        seasonChange = (
-            1
-            if self.arrWeather[2] == 0 and cloudsChangeChance[2] <= 0.25
-            else -1
-            if self.arrWeather[2] == 1
-            else 1
-            if self.arrWeather[2] == 2 and cloudsChangeChance[2] <= 0.25
-            else 1
-            if self.arrWeather[2] == 3 and cloudsChangeChance[2] <= 0.50
-            else 0
-        )
-        # Alter clouds value by precipitation
-        precipitationChange = (
-            2
-            if self.arrWeather[5] == 3 and cloudsChangeChance[3] <= 0.75
-            else 1
-            if self.arrWeather[5] == 2 and cloudsChangeChance[3] <= 0.50
-            else 1
-            if self.arrWeather[5] == 1 and cloudsChangeChance[3] <= 0.25
-            else 0
-        )
+        cloudsChangeChance = self.random.random(4)
         # Bound minimum and maximum cloud cover values
+        weather = self.arrWeather.tolist()
         self.arrWeather[7] = min(
             3,
             max(
                 0,
-                self.arrWeather[7]
-                + randomization
-                + altitudeChange
-                + climateChange
-                + seasonChange
-                + precipitationChange,
+                weather[7] + randomization + _ruleChanges(weather, _cloudRules, cloudsChangeChance),
             ),
         )
-        if flush is True:
+        if flush is True and isinstance(self.arrWeather, np.memmap):
             self.arrWeather.flush()
 
-    def displayWeather(self, displayMode: _DisplayModesType = "all"):
+    def forecast(self, days: int = 1) -> Dict[str, NDArray[np.float64] | Dict[str, float] | float]:
+        """
+        Calculates the exact probability of each weather value a number of days ahead, \
+        assuming altitude, climate, and season stay the same.
+            Wind and fog, and precipitation and cloud cover, are advanced as Markov chains \
+            using powers of their transition matrices cached per altitude, climate, and season. \
+            Temperature is advanced day by day together with wind.
+
+        Parameters
+        ----------
+        days : int
+            The number of days ahead to forecast.
+            Defaults to 1
+
+        Returns
+        -------
+        Dict[str, NDArray[np.float64] | Dict[str, float] | float]
+            'wind', 'fog', 'precipitation', 'cloudCover': The probability of each value [0-3].
+            'temperature': The probability of each temperature in temperatureStates.
+            'temperatureBand': The probability of 'Extreme Cold' (32 or below), 'Cold' (33-38), \
+            'Mild' (39-89), and 'Extreme Heat' (90 or above).
+            'precipitationType': The probability of each type of precipitation occurring.
+            'dustStorm', 'thunderstorm': The probability of each storm occurring.
+        """
+        if days < 0:
+            raise ValueError(f"Days: {days} can not be negative.")
+        altitude, climate, season = (int(value) for value in self.arrWeather[:3])
+        windFog = np.zeros(16)
+        windFog[self.arrWeather[3] * 4 + self.arrWeather[6]] = 1
+        precipitationClouds = np.zeros(16)
+        precipitationClouds[self.arrWeather[5] * 4 + self.arrWeather[7]] = 1
+        windTemperature = np.zeros((4, len(temperatureStates)))
+        windTemperature[self.arrWeather[3], int(self.arrWeather[4]) + 128] = 1
+        return _summarizeForecast(
+            _advanceChain(windFog, altitude, climate, season, 1, days),
+            _advanceChain(precipitationClouds, altitude, climate, season, 2, days),
+            _advanceTemperature(windTemperature, altitude, climate, season, days),
+            climate,
+            season,
+        )
+
+    def stationaryForecast(self) -> Dict[str, NDArray[np.float64] | Dict[str, float] | float]:
+        """
+        Calculates the long run probability of each weather value, \
+        assuming altitude, climate, and season stay the same.
+
+        Returns
+        -------
+        Dict[str, NDArray[np.float64] | Dict[str, float] | float]
+            The same probabilities as forecast.
+        """
+        altitude, climate, season = (int(value) for value in self.arrWeather[:3])
+        return _summarizeForecast(
+            *_stationaryDistributions(altitude, climate, season), climate, season
+        )
+
+    def hourlyWeather(self, days: int = 1) -> Tuple[NDArray[np.int8], Dict[str, NDArray]]:
+        """
+        Simulates hour by hour weather starting from the weather array, without changing it.
+            The simulation draws from a generator spawned from the region's seed, \
+            so it never changes the random values of the region's daily weather.
+
+        Parameters
+        ----------
+        days : int
+            The number of days to simulate.
+            Defaults to 1
+
+        Returns
+        -------
+        Tuple[NDArray[np.int8], Dict[str, NDArray]]
+            The (days * 24, 8) array of hourly weather and the hourly conditions from simulateHourly.
+        """
+        return simulateHourly(self.arrWeather, days, self.random.spawn())
+
+    def displayWeather(
+        self, displayMode: _DisplayModesType = "all", writer: OutputWriter | None = None
+    ):
         """
         Displays description of weather and/or game mechanical effects based on the weather array.
 
@@ -657,198 +1007,482 @@ class WeatherData:
                 'description': Print only descriptive texts.
                 'gameEffect": Print only mechanical effects.
             Defaults to 'all'
+        writer : OutputWriter | None
+            The writer to write the day's 'weather' record and its text to. \
+            The record holds the fields of the displayed modes.
+            Defaults to a text writer on stdout.
 
         Returns
         -------
         None if weather display was successful.
         """
-        # Set default weather flags for all display types
-        dustStorm = False
-        thunderstorm = False
-        precipType = None
-        # Determine if a dust storm occurs
-        if self.arrWeather[5] == 0:
-            if (
-                self.arrWeather[1] in [3, 4]
-                and self.arrWeather[3] == 3
-                and np.random.random() <= 0.05
-            ):
-                dustStorm = True
-        else:
-            # Determine if a thunderstorm occurs
-            if self.arrWeather[5] == 3:
-                thunderstormChance = np.random.random()
-                if self.arrWeather[2] == 0 and thunderstormChance <= 0.12:
-                    thunderstorm = True
-                if self.arrWeather[2] == 1 and thunderstormChance <= 0.20:
-                    thunderstorm = True
-                if self.arrWeather[2] == 2 and thunderstormChance <= 0.07:
-                    thunderstorm = True
-                if self.arrWeather[2] == 3 and thunderstormChance <= 0.01:
-                    thunderstorm = True
-
-            # Determine precipiration type
-            altPrecipChances = np.random.random(2)
-            if self.arrWeather[4] <= 32 and altPrecipChances[0] <= 0.25:
-                precipType = "Freezing Rain"
-            elif self.arrWeather[4] <= 32:
-                precipType = "Snow"
-            elif 33 <= self.arrWeather[4] <= 38:
-                precipType = "Sleet"
-            elif altPrecipChances[1] <= 0.10:
-                precipType = "Hail"
-            else:
-                precipType = "Rain"
+        output = OutputWriter() if writer is None else writer
+        # Storms and precipitation type are resolved once per day and reused
+        dustStorm, thunderstorm, precipType = self.conditions()
+        # Set display strings from weather array data
+        altitudeDisplay = ["None", "Low", "Moderate", "High", "Extreme"][
+            self.arrWeather[0]
+        ]
+        climateDisplay = ["Cold", "Cool", "Temperate", "Warm", "Hot"][
+            self.arrWeather[1]
+        ]
+        seasonDisplay = ["Spring", "Summer", "Autumn", "Winter"][self.arrWeather[2]]
+        windDisplay = ["None", "Low", "Moderate", "High"][self.arrWeather[3]]
+        precipitationDisplay = ["None", "Light", "Moderate", "Heavy"][
+            self.arrWeather[5]
+        ]
+        obscurementDisplay = ["None", "Light", "Moderate", "Heavy"][
+            self.arrWeather[6]
+        ]
+        cloudCoverDisplay = ["None", "Light", "Moderate", "Heavy"][
+            self.arrWeather[7]
+        ]
+        # Set default values for game effects
+        sightPerceptionPenalty = 0
+        hearingPerceptionPenalty = 0
+        surpriseChance = 1
+        encounterDistance = 1
+        rangedWeaponAttackPenalty = 0
+        travelPaceMult = 1
+        # Calculate game effects based on weather conditions
+        if dustStorm is True:
+            encounterDistance /= 2
+            surpriseChance += 1
+            sightPerceptionPenalty -= 4
+            hearingPerceptionPenalty -= 4
+        if precipType == "Rain" and self.arrWeather[5] == 3:
+            encounterDistance /= 2
+            surpriseChance += 1
+            sightPerceptionPenalty -= 4
+            hearingPerceptionPenalty -= 4
+        if precipType == "Snow" and self.arrWeather[5] == 3:
+            encounterDistance /= 2
+            surpriseChance += 1
+            sightPerceptionPenalty -= 4
+            travelPaceMult /= 2
+        if precipType == "Rain" and self.arrWeather[5] == 2:
+            sightPerceptionPenalty -= 2
+            hearingPerceptionPenalty -= 2
+        if precipType == "Snow" and self.arrWeather[5] == 2:
+            sightPerceptionPenalty -= 2
+        if self.arrWeather[6] == 3:
+            encounterDistance /= 2
+            surpriseChance += 1
+            sightPerceptionPenalty -= 4
+            travelPaceMult /= 2
+        if self.arrWeather[6] == 2:
+            encounterDistance /= 2
+            surpriseChance += 1
+            sightPerceptionPenalty -= 2
+        if self.arrWeather[3] == 3:
+            hearingPerceptionPenalty -= 4
+            rangedWeaponAttackPenalty -= 2
+        # Write one record per day, so the day can be written as a single TSV row
+        fields = {}
+        if displayMode in ["all", "description"]:
+            fields.update(
+                altitude=altitudeDisplay,
+                climate=climateDisplay,
+                season=seasonDisplay,
+                wind=windDisplay,
+                temperature=int(self.arrWeather[4]),
+                high=int(self.arrWeather[4]) + 10,
+                low=int(self.arrWeather[4]) - 10,
+                precipitation=precipitationDisplay,
+                precipitationType=precipType,
+                fog=obscurementDisplay,
+                cloudCover=cloudCoverDisplay,
+                dustStorm=dustStorm,
+                thunderstorm=thunderstorm,
+            )
+        if displayMode in ["all", "gameEffect"]:
+            fields.update(
+                surpriseChance=surpriseChance,
+                sightPerceptionPenalty=sightPerceptionPenalty,
+                hearingPerceptionPenalty=hearingPerceptionPenalty,
+                rangedWeaponAttackPenalty=rangedWeaponAttackPenalty,
+                enclosedEncounterFeet=int(encounterDistance * 6),
+                openEncounterFeet=int(encounterDistance * 12),
+                travelPaceMultiplier=travelPaceMult,
+            )
+        output.write("weather", **fields)
         # Provide descriptive text for the weather array
         if displayMode in ["all", "description"]:
-            # Set display strings from weather array data
-            altitudeDisplay = ["None", "Low", "Moderate", "High", "Extreme"][
-                self.arrWeather[0]
-            ]
-            climateDisplay = ["Cold", "Cool", "Temperate", "Warm", "Hot"][
-                self.arrWeather[1]
-            ]
-            seasonDisplay = ["Spring", "Summer", "Autumn", "Winter"][self.arrWeather[2]]
-            windDisplay = ["None", "Low", "Moderate", "High"][self.arrWeather[3]]
-            precipitationDisplay = ["None", "Light", "Moderate", "Heavy"][
-                self.arrWeather[5]
-            ]
-            obscurementDisplay = ["None", "Light", "Moderate", "Heavy"][
-                self.arrWeather[6]
-            ]
-            cloudCoverDisplay = ["None", "Light", "Moderate", "Heavy"][
-                self.arrWeather[7]
-            ]
             # Print the resulting descriptive text
-            print(
-                f"\x1b[4m# <<< Weather was generated for {seasonDisplay} in a {climateDisplay} climate{f' at {altitudeDisplay} altitude' if self.arrWeather[0] != 0 else ''}. >>> #\x1b[m"
+            output.text(
+                f"# <<< Weather was generated for {seasonDisplay} in a {climateDisplay} climate{f' at {altitudeDisplay} altitude' if self.arrWeather[0] != 0 else ''}. >>> #",
+                "underline",
             )
             if self.arrWeather[4] >= 90:
-                print("Extreme Heat is in effect.")
+                output.text("Extreme Heat is in effect.")
             elif self.arrWeather[4] <= 32:
-                print("Extreme Cold is in effect.")
-            print(
+                output.text("Extreme Cold is in effect.")
+            output.text(
                 f"The High Temperature is {self.arrWeather[4] + 10} and the Low Temperature is {self.arrWeather[4] - 10}."
             )
             if self.arrWeather[3] != 0:
-                print(f"There are {windDisplay} Winds.")
+                output.text(f"There are {windDisplay} Winds.")
             if dustStorm is True:
-                print("A dust storm will occur today.")
+                output.text("A dust storm will occur today.")
             elif thunderstorm is True:
-                print(
+                output.text(
                     f"A thunderstorm will occur today with {precipitationDisplay} {precipType}."
                 )
             elif self.arrWeather[5] != 0:
-                print(f"{precipitationDisplay} {precipType} will occur today.")
+                output.text(f"{precipitationDisplay} {precipType} will occur today.")
             if self.arrWeather[6] != 0:
-                print(f"There is {obscurementDisplay} Fog.")
+                output.text(f"There is {obscurementDisplay} Fog.")
             if self.arrWeather[7] != 0:
-                print(f"There is {cloudCoverDisplay} Cloud Cover.")
+                output.text(f"There is {cloudCoverDisplay} Cloud Cover.")
 
         # Provide mechanical effects for the weather array
         if displayMode in ["all", "gameEffect"]:
-            # Set default values for game effects
-            sightPerceptionPenalty = 0
-            hearingPerceptionPenalty = 0
-            surpriseChance = 1
-            encounterDistance = 1
-            rangedWeaponAttackPenalty = 0
-            travelPaceMult = 1
-            # Calculate game effects based on weather conditions
-            if dustStorm is True:
-                encounterDistance /= 2
-                surpriseChance += 1
-                sightPerceptionPenalty -= 4
-                hearingPerceptionPenalty -= 4
-            if precipType == "Rain" and self.arrWeather[5] == 3:
-                encounterDistance /= 2
-                surpriseChance += 1
-                sightPerceptionPenalty -= 4
-                hearingPerceptionPenalty -= 4
-            if precipType == "Snow" and self.arrWeather[5] == 3:
-                encounterDistance /= 2
-                surpriseChance += 1
-                sightPerceptionPenalty -= 4
-                travelPaceMult /= 2
-            if precipType == "Rain" and self.arrWeather[5] == 2:
-                sightPerceptionPenalty -= 2
-                hearingPerceptionPenalty -= 2
-            if precipType == "Snow" and self.arrWeather[5] == 2:
-                sightPerceptionPenalty -= 2
-            if self.arrWeather[6] == 3:
-                encounterDistance /= 2
-                surpriseChance += 1
-                sightPerceptionPenalty -= 4
-                travelPaceMult /= 2
-            if self.arrWeather[6] == 2:
-                encounterDistance /= 2
-                surpriseChance += 1
-                sightPerceptionPenalty -= 2
-            if self.arrWeather[3] == 3:
-                hearingPerceptionPenalty -= 4
-                rangedWeaponAttackPenalty -= 2
             # Print the resulting game mechanics text
-            print("\x1b[4m# <<< Travel Effects >>> #\x1b[m")
+            output.text("# <<< Travel Effects >>> #", "underline")
             if self.arrWeather[4] >= 90:
-                print(
+                output.text(
                     "Characters gain Fatigue equal to 1d4 plus their Encumbrance at the end of each period of Extended Travel. This increases by 1 if the creature is wearing Medium or Heavy Armor or has any Encumbrance."
                 )
             elif self.arrWeather[4] <= 32:
-                print(
+                output.text(
                     "Characters gain Fatigue equal to 1d4 plus their Encumbrance at the end of each period of Extended Travel."
                 )
             else:
-                print(
+                output.text(
                     "Characters gain Fatigue equal to their Encumbrance at the end of each period of Extended Travel."
                 )
             if travelPaceMult == 1 / 2:
-                print("The party's Travel Pace is halved.")
+                output.text("The party's Travel Pace is halved.")
             if travelPaceMult == 1 / 4:
-                print("The party's Travel Pace is quartered.")
+                output.text("The party's Travel Pace is quartered.")
             if dustStorm is True:
-                print(
+                output.text(
                     "Unprotected creatures take 1 Slashing Damage at the end of each hour they spend exposed to the storm."
                 )
             if precipType in ["Hail", "Sleet"] and self.arrWeather[5] == 3:
-                print(
+                output.text(
                     "Unprotected creatures take 1 Bludgeoning Damage at the end of each hour they spend exposed to the storm."
                 )
             if thunderstorm is True:
-                print(
+                output.text(
                     "Each hour there is a 1 / 100 chance of lightning striking near a group of travelers. If lightning strikes near a group of travelers, there is a 1 / 100 chance for a character at random to be struck, or a 1 / 10 chance if that character is wearing Heavy Armor. The struck creature is Dazed for 1 hour and must make a Fortitude Saving Throw. A creature takes 2d12 Lightning Damage on a failed saving throw, or half as much on a success."
                 )
             if self.arrWeather[3] == 3:
-                print(
+                output.text(
                     "The High Winds count as Difficult Terrain for flying creatures and disperse fog and mists."
                 )
             if precipType == "Rain" and self.arrWeather[5] == 3:
-                print("Flash floods may occur.")
+                output.text("Flash floods may occur.")
             if (
                 precipType == "Rain"
                 and self.arrWeather[5] != 0
                 or self.arrWeather[5] == 3
             ):
-                print("Open flames are extinguished.")
-            print("\x1b[4m# <<< Combat Effects >>> #\x1b[m")
-            print(
+                output.text("Open flames are extinguished.")
+            output.text("# <<< Combat Effects >>> #", "underline")
+            output.text(
                 f"If a side of a combat is unaware of the other's presence, they have a {surpriseChance} in 6 chance of being Surprised."
             )
             if sightPerceptionPenalty != 0:
-                print(
+                output.text(
                     f"Creatures have a {sightPerceptionPenalty} Penalty to Perception that relies on sight."
                 )
             if hearingPerceptionPenalty != 0:
-                print(
+                output.text(
                     f"Creatures have a {hearingPerceptionPenalty} Penalty to Perception that relies on hearing."
                 )
-            print(
-                f"Enclosed Encounters Occur: 2d10 x {int(encounterDistance * 6)} feet apart.\nWide Open Encounters Occur: 4d10 x {int(encounterDistance * 12)} feet apart."
+            output.text(
+                f"Enclosed Encounters Occur: 2d10 x {int(encounterDistance * 6)} feet apart."
+            )
+            output.text(
+                f"Wide Open Encounters Occur: 4d10 x {int(encounterDistance * 12)} feet apart."
             )
             if rangedWeaponAttackPenalty != 0:
-                print(
+                output.text(
                     f"Creatures have a {rangedWeaponAttackPenalty} Penalty to Ranged Weapon Attacks."
                 )
 
+        if writer is None:
+            output.flush()
+
+class WeatherPool:
+    """
+    Provides WeatherData handles for many region files while keeping a bounded number of them mapped.
+        Handles are kept in least recently used order, and opening a region beyond maxOpen \
+        flushes and closes the region used longest ago. Reopening a region that is still open \
+        returns the same handle, so its buffered random values are kept between uses.
+        Handles should be fetched from the pool again instead of being kept, \
+        since the methods of an evicted handle raise a ValueError.
+    """
+
+    def __init__(self, maxOpen: int = 128, mode: _FileModesType = "r+"):
+        self.maxOpen = maxOpen
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._handles: OrderedDict[str, WeatherData] = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._handles)
+
+    def __contains__(self, file: _PathLikeType):
+        return os.path.abspath(os.fsdecode(file)) in self._handles
+
+    def get(
+        self,
+        file: _PathLikeType,
+        mode: _FileModesType | None = None,
+        seed: int | None = None,
+    ) -> WeatherData:
+        """
+        Provides an open handle to a region's weather file, opening it if needed.
+
+        Parameters
+        ----------
+        file : str | bytes | os.PathLike
+            The binary weather file of the region.
+        mode : 'r', 'r+', 'w+' | None
+            The mode with which to map the file if it is not already open.
+            Defaults to the pool's mode.
+        seed : int | None
+            If present, seeds the random values of a newly opened handle. \
+            A region that is already open must have been opened with the same seed.
+            Defaults to the seed of the open handle.
+
+        Returns
+        -------
+        WeatherData
+            The open handle of the region.
+        """
+        key = os.path.abspath(os.fsdecode(file))
+        mode = self.mode if mode is None else mode
+        weather = self._handles.get(key)
+        if weather is not None and seed is not None and seed != weather.seed:
+            raise ValueError(
+                f"File: {weather.file} is already open with seed {weather.seed} and thus cannot be opened with seed {seed}."
+            )
+        # A handle opened read only is reopened if write access is requested
+        if weather is not None and not (mode != "r" and weather.mode == "r"):
+            self.hits += 1
+            self._handles.move_to_end(key)
+            return weather
+        self.misses += 1
+        if weather is not None:
+            seed = weather.seed
+            self._handles.pop(key).close()
+        weather = WeatherData(file, mode, seed)
+        self._handles[key] = weather
+        while len(self._handles) > self.maxOpen:
+            self._handles.popitem(last=False)[1].close()
+            self.evictions += 1
+        return weather
+
+    def flush(self):
+        """
+        Flushes the changes of every open writable handle to disk.
+
+        Returns
+        -------
+        None if every handle was successfully flushed.
+        """
+        for weather in self._handles.values():
+            if weather.mode != "r":
+                weather.arrWeather.flush()
+
+    def close(self):
+        """
+        Flushes and closes every open handle.
+
+        Returns
+        -------
+        None if every handle was successfully closed.
+        """
+        while self._handles:
+            self._handles.popitem(last=False)[1].close()
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Summarizes how often requested regions were already open.
+
+        Returns
+        -------
+        Dict[str, int | float]
+            The number of open handles, hits, misses, evictions, and the hit rate.
+        """
+        requests = self.hits + self.misses
+        return {
+            "open": len(self._handles),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": self.hits / requests if requests else 0.0,
+        }
+
+
+class WeatherHistory:
+    """
+    Provides compact storage of every past day of a region's weather.
+        Each day's random values are seeded from the history seed and the day number, \
+        so a day, including its resolved storms and precipitation type, \
+        is fully determined by the weather the day before. \
+        The full weather array is only saved as a checkpoint every checkpointInterval days \
+        and whenever it is changed by hand, and any other day is rebuilt on demand \
+        by replaying randomizeWeather from the nearest earlier checkpoint.
+        Larger intervals store less and take longer to look up.
+        Recently rebuilt days are kept in a least recently used cache and also serve as replay starting points.
+        Checkpoints are appended to a binary file, and the seed, interval, and current day \
+        are stored in a JSON file next to it.
+    """
+
+    def __init__(
+        self,
+        weather: WeatherData,
+        file: _PathLikeType,
+        checkpointInterval: int = 30,
+        seed: int | None = None,
+        cacheSize: int = 64,
+    ):
+        self.weather = weather
+        self.file = file
+        self.cacheSize = cacheSize
+        self._cache: OrderedDict[int, NDArray[np.int8]] = OrderedDict()
+        self._metaFile = f"{os.fsdecode(file)}.json"
+        self._checkpointDtype = np.dtype(
+            [("day", np.int32), ("weather", np.int8, len(weather.arrWeather))]
+        )
+        if os.path.isfile(file) and os.path.isfile(self._metaFile):
+            with open(self._metaFile) as metaFile:
+                meta = json.load(metaFile)
+            self.seed = meta["seed"]
+            self.checkpointInterval = meta["checkpointInterval"]
+            self.day = meta["day"]
+            self.checkpoints = np.fromfile(file, dtype=self._checkpointDtype)
+        else:
+            self.seed = (
+                int(np.random.SeedSequence().entropy) if seed is None else seed
+            )
+            self.checkpointInterval = checkpointInterval
+            self.day = 0
+            self.checkpoints = np.empty(0, dtype=self._checkpointDtype)
+            open(file, "wb").close()
+            self._checkpoint()
+
+    def _seedFor(self, day: int) -> Tuple[int, int]:
+        return (self.seed, day)
+
+    def _checkpoint(self):
+        # Append the current day's weather and record the current day
+        checkpoint = np.array(
+            [(self.day, np.array(self.weather.arrWeather))], dtype=self._checkpointDtype
+        )
+        with open(self.file, "ab") as historyFile:
+            checkpoint.tofile(historyFile)
+        self.checkpoints = np.concatenate([self.checkpoints, checkpoint])
+        self._saveMeta()
+
+    def _saveMeta(self):
+        with open(self._metaFile, "w") as metaFile:
+            json.dump(
+                {
+                    "seed": self.seed,
+                    "checkpointInterval": self.checkpointInterval,
+                    "day": self.day,
+                },
+                metaFile,
+            )
+
+    def advanceDay(self, days: int = 1, flush: bool = True):
+        """
+        Randomly progresses the region's weather by a number of days, saving checkpoints as needed.
+
+        Parameters
+        ----------
+        days : int
+            The number of days to progress.
+            Defaults to 1
+        flush : bool
+            If true, flushes changes to the weather array to the memory mapped file.
+
+        Returns
+        -------
+        None if the weather was successfully progressed.
+        """
+        for _ in range(days):
+            self.day += 1
+            self.weather.random = RandomBuffer(self._seedFor(self.day), blockSize=32)
+            self.weather.randomizeWeather(flush=False)
+            self.weather.conditions(flush=False)
+            if self.day % self.checkpointInterval == 0:
+                self._checkpoint()
+        if flush is True and isinstance(self.weather.arrWeather, np.memmap):
+            self.weather.arrWeather.flush()
+        self._saveMeta()
+
+    def setWeather(self, **values: int):
+        """
+        Manually updates weather values on the current day and saves a checkpoint so replays include the change.
+
+        Parameters
+        ----------
+        **values : int
+            Any arguments accepted by WeatherData.setWeather.
+
+        Returns
+        -------
+        None if the weather array was successfully updated.
+        """
+        self.weather.setWeather(**values)
+        self.weather.conditions(flush=False)
+        self._cache.pop(self.day, None)
+        self._checkpoint()
+
+    def weatherOn(self, day: int) -> NDArray[np.int8]:
+        """
+        Provides the weather array of any day up to the current day.
+
+        Parameters
+        ----------
+        day : int
+            The day to look up, where day 0 is when the history was created.
+
+        Returns
+        -------
+        NDArray[np.int8]
+            A copy of the weather array of the day.
+        """
+        if not 0 <= day <= self.day:
+            raise ValueError(f"Day: {day} is outside of the recorded days 0 to {self.day}.")
+        if day == self.day:
+            return np.array(self.weather.arrWeather)
+        if day in self._cache:
+            self._cache.move_to_end(day)
+            return self._cache[day].copy()
+        # Start from the latest checkpoint on or before the day, or a later cached day
+        index = np.searchsorted(self.checkpoints["day"], day, side="right") - 1
+        startDay = int(self.checkpoints["day"][index])
+        arrWeather = self.checkpoints["weather"][index]
+        cachedDays = [cached for cached in self._cache if startDay < cached < day]
+        if cachedDays:
+            startDay = max(cachedDays)
+            arrWeather = self._cache[startDay]
+        replay = WeatherData.fromArray(arrWeather)
+        for replayDay in range(startDay + 1, day + 1):
+            replay.random = RandomBuffer(self._seedFor(replayDay), blockSize=32)
+            replay.randomizeWeather(flush=False)
+        if startDay < day:
+            replay.conditions(flush=False)
+        self._cache[day] = replay.arrWeather
+        if len(self._cache) > self.cacheSize:
+            self._cache.popitem(last=False)
+        return replay.arrWeather.copy()
+
 
 if __name__ == "__main__":
     dataTest = WeatherData("../../savedData/weather/asiir.dat", "r+")